@@ -2,6 +2,18 @@
 # Assignment:  6
 # Description: Provided data structures necessary to complete assignment 6.
 
+import importlib
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+try:
+    import numpy
+except ImportError:     # optional, only used to speed up hash_many()
+    numpy = None
+
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -13,38 +25,80 @@ class DynamicArray:
     """
     Class implementing a Dynamic Array
     Supported methods are:
-    append, pop, swap, get_at_index, set_at_index, length
+    append, pop, swap, get_at_index, set_at_index, length,
+    iteration, len() and slicing, which returns a view sharing the array's storage.
+    Typed arrays (see __init__) also support the buffer protocol.
     """
 
-    def __init__(self, arr=None) -> None:
-        """Initialize new dynamic array using a list."""
-        self._data = arr.copy() if arr else []
+    def __init__(self, arr=None, typecode: str = None, copy: bool = True) -> None:
+        """
+        Initialize new dynamic array using a list (or any iterable).
+        With a typecode the elements are stored unboxed in an array.array of that type,
+        'q' for 64-bit integers or 'd' for doubles, and the dynamic array can be handed
+        to memoryview() or numpy.frombuffer() as is.
+        With copy=False the given list or array.array itself becomes the storage, and any
+        other buffer (bytes, bytearray, mmap, numpy arrays...) is wrapped in a fixed-size
+        memoryview, cast to typecode if one is given. Nothing is copied either way.
+        """
+        if not copy and arr is not None:
+            if (typecode is None and isinstance(arr, list)
+                    or isinstance(arr, array) and typecode in (None, arr.typecode)):
+                data = arr
+            else:
+                data = memoryview(arr)
+                if typecode is not None and data.format != typecode:
+                    data = data.cast('B').cast(typecode)
+        elif typecode is not None:
+            data = array(typecode, arr if arr is not None else ())
+        else:
+            data = list(arr) if arr else []
+        self._data = data
+
+    @classmethod
+    def _wrap(cls, data) -> "DynamicArray":
+        """Return a dynamic array using data (a list, array, memoryview or _ListSlice) as its storage."""
+        view = cls.__new__(cls)
+        view._data = data
+        return view
 
     def __iter__(self):
-        """
-        Disable iterator capability for DynamicArray class
-        This means loops and aggregate functions like
-        those shown below won't work:
+        """Return an iterator over the elements."""
+        return iter(self._data)
 
-        da = DynamicArray()
-        for value in da:        # will not work
-        min(da)                 # will not work
-        max(da)                 # will not work
-        sort(da)                # will not work
-        """
-        return None
+    def __len__(self) -> int:
+        """Return length of array."""
+        return len(self._data)
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
-        return str(self._data)
+        if type(self._data) is list:
+            return str(self._data)
+        return str(list(self._data))
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """Export the storage of a typed array through the buffer protocol (Python 3.12+)."""
+        return memoryview(self._data)
+
+    def as_buffer(self) -> memoryview:
+        """
+        Return a memoryview of the storage of a typed array, sharing its memory.
+        While a view is alive the array can't grow or shrink (BufferError).
+        """
+        return memoryview(self._data)
 
     def append(self, value: object) -> None:
         """Add new element at the end of the array."""
-        self._data.append(value)
+        try:
+            self._data.append(value)
+        except AttributeError:
+            raise DynamicArrayException("a view or buffer backed array has a fixed size") from None
 
     def pop(self):
         """Remove element from end of the array and return it."""
-        return self._data.pop()
+        try:
+            return self._data.pop()
+        except AttributeError:
+            raise DynamicArrayException("a view or buffer backed array has a fixed size") from None
 
     def swap(self, i: int, j: int) -> None:
         """Swap two elements in array given their indices."""
@@ -52,29 +106,80 @@ class DynamicArray:
 
     def get_at_index(self, index: int):
         """Return value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if not 0 <= index < len(self._data):
             raise DynamicArrayException
         return self._data[index]
 
     def __getitem__(self, index: int):
-        """Return value of element at a given index using [] syntax."""
-        return self.get_at_index(index)
+        """
+        Return value of element at a given index using [] syntax.
+        A slice returns a dynamic array viewing that part of this one: no elements
+        are copied, and setting an element of either changes both.
+        """
+        if type(index) is slice:
+            return self._slice(index)
+        if not 0 <= index < len(self._data):
+            raise DynamicArrayException
+        return self._data[index]
+
+    def _slice(self, index: slice) -> "DynamicArray":
+        """Return a dynamic array viewing the given slice of this one."""
+        data = self._data
+        if type(data) is list:
+            return self._wrap(_ListSlice(data, range(len(data))[index]))
+        if type(data) is array:
+            return self._wrap(memoryview(data)[index])
+        # memoryviews and list slices slice themselves without copying
+        return self._wrap(data[index])
 
     def set_at_index(self, index: int, value: object) -> None:
         """Set value of element at a given index."""
-        if index < 0 or index >= self.length():
+        if not 0 <= index < len(self._data):
             raise DynamicArrayException
         self._data[index] = value
 
     def __setitem__(self, index: int, value: object) -> None:
         """Set value of element at a given index using [] syntax."""
-        self.set_at_index(index, value)
+        if not 0 <= index < len(self._data):
+            raise DynamicArrayException
+        self._data[index] = value
 
     def length(self) -> int:
         """Return length of array."""
         return len(self._data)
 
 
+class _ListSlice:
+    """
+    Window onto part of a list: what a memoryview is to an array, for slicing
+    list backed dynamic arrays without copying their elements.
+    """
+    __slots__ = ('_list', '_range')
+
+    def __init__(self, data: list, indices: range) -> None:
+        """Initialize a window onto the elements of data at the given indices."""
+        self._list = data
+        self._range = indices
+
+    def __len__(self) -> int:
+        """Return the number of elements in the window."""
+        return len(self._range)
+
+    def __iter__(self):
+        """Return an iterator over the elements in the window."""
+        return map(self._list.__getitem__, self._range)
+
+    def __getitem__(self, index):
+        """Return the element at index in the window, or a window onto a slice of it."""
+        if type(index) is slice:
+            return _ListSlice(self._list, self._range[index])
+        return self._list[self._range[index]]
+
+    def __setitem__(self, index: int, value: object) -> None:
+        """Set the element at index in the window."""
+        self._list[self._range[index]] = value
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -93,18 +198,410 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+def hash_many(function, keys: list) -> list:
+    """
+    Return the hashes of a batch of keys, in order.
+    With NumPy installed, hash_function_1 and hash_function_2 hash the whole batch at once:
+    the keys become a zero padded matrix of code points, hash_function_1 is its row sums
+    and hash_function_2 its dot product with the weights 1, 2, 3, ...
+    Any other function is applied key by key.
+    """
+    if numpy is not None and keys and (function is hash_function_1 or function is hash_function_2):
+        lengths = numpy.fromiter(map(len, keys), dtype=numpy.int64, count=len(keys))
+        longest = int(lengths.max())
+
+        # a few very long keys would blow up the padded matrix (or overflow int64 sums)
+        if 0 < longest < 1 << 20 and len(keys) * longest <= 8 * int(lengths.sum()) + 1024:
+            codes = numpy.frombuffer(''.join(keys).encode('utf-32-le', 'surrogatepass'), dtype=numpy.uint32)
+            matrix = numpy.zeros((len(keys), longest), dtype=numpy.int64)
+            matrix[numpy.arange(longest) < lengths[:, None]] = codes
+
+            if function is hash_function_1:
+                return matrix.sum(axis=1).tolist()
+            return (matrix @ numpy.arange(1, longest + 1, dtype=numpy.int64)).tolist()
+
+    return [function(key) for key in keys]
+
+
+class ResizePolicy:
+    """
+    When and how far a HashMap grows or shrinks its table:
+    max_load       grow once the load factor reaches it
+    growth_factor  multiply the capacity by it when growing
+    min_load       shrink once the load factor falls below it (0 never shrinks)
+    hysteresis     after a shrink the load factor is max_load * (1 - hysteresis),
+                   so the next few puts don't grow the table straight back
+    min_capacity   never shrink below it
+    """
+
+    def __init__(self, max_load: float, growth_factor: float = 2.0, min_load: float = 0.0,
+                 hysteresis: float = 0.5, min_capacity: int = 11) -> None:
+        """Initialize and validate a resize policy."""
+        if max_load <= 0 or growth_factor <= 1 or not 0 <= hysteresis < 1:
+            raise ValueError("need max_load > 0, growth_factor > 1 and 0 <= hysteresis < 1")
+        if not 0 <= min_load < max_load * (1 - hysteresis):
+            raise ValueError("min_load must be below max_load * (1 - hysteresis), "
+                             "or every shrink would trigger another one")
+
+        self.max_load = max_load
+        self.growth_factor = growth_factor
+        self.min_load = min_load
+        self.hysteresis = hysteresis
+        self.min_capacity = min_capacity
+
+    def grown_capacity(self, capacity: int) -> int:
+        """Return the capacity to grow a full table of the given capacity to."""
+        return max(int(capacity * self.growth_factor), capacity + 1)
+
+    def capacity_for(self, size: int) -> int:
+        """Return the smallest capacity that holds size entries without growing."""
+        return max(int(size / self.max_load) + 1, self.min_capacity)
+
+    def should_shrink(self, size: int, capacity: int) -> bool:
+        """Return True if a table of the given size and capacity is due to shrink."""
+        return capacity > self.min_capacity and size < self.min_load * capacity
+
+    def shrunk_capacity(self, size: int) -> int:
+        """Return the capacity to shrink a table holding size entries to."""
+        return max(int(size / (self.max_load * (1 - self.hysteresis))) + 1, self.min_capacity)
+
+
+class KeysView:
+    """
+    Live view of a HashMap's keys, returned by its keys() method. Like the views of
+    a dict it copies nothing: every loop over it streams from the map's buckets,
+    several loops can run at once, and a loop raises RuntimeError if the map gains
+    or loses keys while it runs.
+    """
+
+    def __init__(self, map) -> None:
+        """Initialize a view of the given map."""
+        self._map = map
+
+    def __len__(self) -> int:
+        """Return the number of keys in the map."""
+        return self._map.get_size()
+
+    def __iter__(self):
+        """Yield the keys of the map."""
+        for key, _ in self._map._iter_entries():
+            yield key
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if key is in the map."""
+        return self._map.contains_key(key)
+
+    def __repr__(self) -> str:
+        """Override repr method to show the view's contents."""
+        return f"{type(self).__name__}({list(self)})"
+
+
+class ValuesView(KeysView):
+    """
+    Live view of a HashMap's values, returned by its values() method, see KeysView.
+    """
+
+    def __iter__(self):
+        """Yield the values of the map."""
+        for _, value in self._map._iter_entries():
+            yield value
+
+    def __contains__(self, value: object) -> bool:
+        """Return True if some key of the map has the given value."""
+        return any(item is value or item == value for item in self)
+
+
+class ItemsView(KeysView):
+    """
+    Live view of a HashMap's (key, value) pairs, returned by its items() method, see KeysView.
+    """
+
+    def __iter__(self):
+        """Yield the (key, value) pairs of the map."""
+        return self._map._iter_entries()
+
+    def __contains__(self, item: tuple) -> bool:
+        """Return True if the map holds the (key, value) pair."""
+        key, value = item
+        if not self._map.contains_key(key):
+            return False
+        found = self._map.get(key)
+        return found is value or found == value
+
+
+# the first twelve primes: as Miller-Rabin bases they decide every n < 3.3 * 10 ** 24
+_PRIME_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(n: int) -> bool:
+    """
+    Deterministic Miller-Rabin primality test, a dozen modular exponentiations
+    however large n is, where trial division takes up to sqrt(n) / 2 divisions.
+    """
+    if n < 2:
+        return False
+
+    for p in _PRIME_BASES:
+        if n % p == 0:
+            return n == p
+
+    # n - 1 == d * 2 ** s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in _PRIME_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False    # a proves n composite
+
+    return True
+
+
+def next_prime(n: int) -> int:
+    """
+    Return the smallest odd prime that is at least n, the capacity a prime sized table uses.
+    """
+    if n % 2 == 0:
+        n += 1
+
+    while not is_prime(n):
+        n += 2
+
+    return n
+
+
+# header of HashMap snapshot files, see write_snapshot()
+_SNAPSHOT_MAGIC = b'A6HM'
+_SNAPSHOT_VERSION = 1
+
+# hashed on save and again on load, to catch a hash function that changed in between
+_PROBE_KEY = 'HashMap snapshot probe'
+
+
+def function_identity(function) -> tuple:
+    """
+    Returns what a snapshot records about a hash function: its importable name,
+    and the hash of a fixed probe key so a different seed or process salt shows up.
+    """
+    return f"{function.__module__}.{function.__qualname__}", function(_PROBE_KEY)
+
+
+def snapshot_function(identity: tuple, function=None):
+    """
+    Returns the hash function of a snapshot: function, or by default the function
+    its recorded name imports. Raises ValueError if it doesn't hash the probe key
+    the way the saved one did, since none of the stored hashes would match.
+    """
+    name, probe = identity
+    if function is None:
+        module, _, qualname = name.rpartition('.')
+        if '<' in name or not module:
+            raise ValueError(f"can't import hash function {name}, pass it to load()")
+        function = getattr(importlib.import_module(module), qualname)
+
+    if function(_PROBE_KEY) != probe:
+        raise ValueError(f"hash function doesn't hash like {name} did when the snapshot was saved "
+                         "(a different function, seed or PYTHONHASHSEED)")
+    return function
+
+
+def write_snapshot(path: str, header: dict, control: bytes, hashes: list, keys: list, values: list) -> None:
+    """
+    Writes a HashMap snapshot file: the magic bytes, a format version and the length of the
+    pickled header dict, the header, then the raw bucket control bytes (if any), the stored
+    hashes as raw 64-bit integers, and the keys and values, pickled as two lists.
+    """
+    try:
+        packed = array('q', hashes)
+    except OverflowError:
+        try:
+            packed = array('Q', hashes)
+        except OverflowError:
+            raise ValueError("only hashes that fit in 64 bits can be saved") from None
+
+    header = dict(header, control_length=len(control), count=len(packed),
+                  hash_typecode=packed.typecode, byteorder=sys.byteorder)
+    header_bytes = pickle.dumps(header, pickle.HIGHEST_PROTOCOL)
+
+    with open(path, 'wb') as file:
+        file.write(_SNAPSHOT_MAGIC + struct.pack('<BI', _SNAPSHOT_VERSION, len(header_bytes)))
+        file.write(header_bytes)
+        file.write(control)
+        packed.tofile(file)
+        pickle.dump((keys, values), file, pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path: str) -> (dict, bytearray, array, list, list):
+    """
+    Reads a file written by write_snapshot().
+    Returns its header, control bytes, hashes, keys and values.
+    Keys and values are unpickled: only load snapshots from a source you trust.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a HashMap snapshot")
+
+        version, length = struct.unpack('<BI', file.read(5))
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(f"{path} has snapshot format {version}, not {_SNAPSHOT_VERSION}")
+
+        header = pickle.loads(file.read(length))
+        control = bytearray(file.read(header['control_length']))
+
+        hashes = array(header['hash_typecode'])
+        hashes.fromfile(file, header['count'])
+        if header['byteorder'] != sys.byteorder:
+            hashes.byteswap()
+
+        keys, values = pickle.load(file)
+
+    return header, control, hashes, keys, values
+
+
+# ----------- Hash function library (plug into HashMap's function) ----------- #
+# The functions below work on the key's UTF-8 bytes with 64-bit integer arithmetic
+# and return values in [0, 2 ** 64). Unlike hash_function_1 they are order sensitive,
+# so anagrams and 'str' + str(i) style keys spread across the whole table.
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def fnv1a_hash(key: str) -> int:
+    """64-bit FNV-1a: xor in each byte, then multiply by the FNV prime."""
+    hash = 0xCBF29CE484222325
+    for byte in key.encode('utf-8'):
+        hash = ((hash ^ byte) * 0x100000001B3) & _MASK_64
+    return hash
+
+
+def murmur_hash(key: str, seed: int = 0) -> int:
+    """
+    MurmurHash64A: mixes the key eight bytes at a time,
+    so long keys cost far fewer Python-level steps than a per-character loop.
+    """
+    data = key.encode('utf-8')
+    m, r = 0xC6A4A7935BD1E995, 47
+
+    hash = (seed ^ (len(data) * m)) & _MASK_64
+    for word in struct.unpack_from('<%dQ' % (len(data) // 8), data):
+        word = (word * m) & _MASK_64
+        word ^= word >> r
+        word = (word * m) & _MASK_64
+        hash = ((hash ^ word) * m) & _MASK_64
+
+    tail = data[len(data) & ~7:]
+    if tail:
+        hash = ((hash ^ int.from_bytes(tail, 'little')) * m) & _MASK_64
+
+    hash ^= hash >> r
+    hash = (hash * m) & _MASK_64
+    return hash ^ (hash >> r)
+
+
+def _rotl64(value: int, bits: int) -> int:
+    """Rotate a 64-bit value left."""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def _siphash24_bytes(data: bytes, k0: int, k1: int) -> int:
+    """SipHash-2-4 of data under the 128-bit key (k0, k1)."""
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    def rounds(count):
+        nonlocal v0, v1, v2, v3
+        for _ in range(count):
+            v0 = (v0 + v1) & _MASK_64
+            v1 = _rotl64(v1, 13) ^ v0
+            v0 = _rotl64(v0, 32)
+            v2 = (v2 + v3) & _MASK_64
+            v3 = _rotl64(v3, 16) ^ v2
+            v0 = (v0 + v3) & _MASK_64
+            v3 = _rotl64(v3, 21) ^ v0
+            v2 = (v2 + v1) & _MASK_64
+            v1 = _rotl64(v1, 17) ^ v2
+            v2 = _rotl64(v2, 32)
+
+    # the last word holds the leftover bytes and the message length in its top byte
+    full = len(data) & ~7
+    words = struct.unpack_from('<%dQ' % (full // 8), data)
+    last = ((len(data) & 0xFF) << 56) | int.from_bytes(data[full:], 'little')
+
+    for word in words + (last,):
+        v3 ^= word
+        rounds(2)
+        v0 ^= word
+
+    v2 ^= 0xFF
+    rounds(4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def siphash(key: str, seed: int = 0) -> int:
+    """
+    SipHash-2-4 keyed with a 128-bit seed. With a secret seed, callers that don't know it
+    can't build keys that all collide, which matters for keys coming from outside.
+    """
+    return _siphash24_bytes(key.encode('utf-8'), seed & _MASK_64, (seed >> 64) & _MASK_64)
+
+
+def seeded_siphash(seed: int):
+    """Return a one-argument SipHash function for the given seed, ready to pass to a HashMap."""
+    def siphash_seeded(key: str) -> int:
+        return _siphash24_bytes(key.encode('utf-8'), seed & _MASK_64, (seed >> 64) & _MASK_64)
+    return siphash_seeded
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Fast path: Python's own (C implemented) string hash folded to 64 bits.
+    String hashes are salted per process unless PYTHONHASHSEED is set,
+    so don't use it for anything that outlives the process.
+    """
+    return hash(key) & _MASK_64
+
+
+def mix_hash(hash: int) -> int:
+    """
+    The MurmurHash3 64-bit finalizer: every input bit flips about half of the output bits.
+    Power-of-two tables index with the low bits of the hash alone, so they run
+    hashes through it first; hashes that only differ in their high bits, or that
+    are all small like hash_function_1's, then still spread over the whole table.
+    Equal hashes stay equal, it can't separate keys the hash function already collided.
+    """
+    hash &= _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xFF51AFD7ED558CCD) & _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xC4CEB9FE1A85EC53) & _MASK_64
+    return hash ^ (hash >> 33)
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
     """
     Singly Linked List node for use in a hash map
     """
+    # no per-node __dict__, a map holds one node per key
+    __slots__ = ('key', 'value', 'next', 'hash')
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None) -> None:
+        """Initialize node given a key, value and (optionally) the key's full hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -165,20 +662,22 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        When the key's hash is given, nodes with a different cached hash are skipped
+        without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -189,13 +688,31 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
-        node = self._head
+    def contains(self, key: str, hash: int = None, reorder: str = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        When the key's hash is given, nodes with a different cached hash are skipped
+        without comparing keys.
+        With reorder set to 'move_to_front' a matching node moves to the head of the list,
+        with 'transpose' it swaps places with the node before it, so the keys that are
+        looked up most drift to the front.
+        """
+        before, previous, node = None, None, self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous is not None and reorder is not None:
+                    previous.next = node.next
+                    if reorder == 'move_to_front':
+                        node.next = self._head
+                        self._head = node
+                    else:
+                        node.next = previous
+                        if before is None:
+                            self._head = node
+                        else:
+                            before.next = node
                 return node
-            node = node.next
+            before, previous, node = previous, node, node.next
         return node
 
     def length(self) -> int:
@@ -203,14 +720,97 @@ class LinkedList:
         return self._size
 
 
+class SortedChain:
+    """
+    Bucket keeping its nodes sorted by (hash, key), for chains too long to walk:
+    contains and remove binary search it with O(log n) comparisons where
+    LinkedList compares every node. The nodes sit in a list next to their sort
+    keys, inserting one shifts the rest over (a C-speed memmove).
+    Supported methods are the same as LinkedList's, hashes must be given.
+    """
+
+    def __init__(self, nodes=()) -> None:
+        """Initialize a sorted chain holding the given nodes."""
+        self._nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+        self._order = [(node.hash, node.key) for node in self._nodes]
+        for node in self._nodes:
+            node.next = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SORTED [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in (hash, key) order."""
+        return iter(self._nodes)
+
+    def _position(self, key: str, hash: int) -> int:
+        """Return the position of the node with matching key, or -1 if no match."""
+        position = bisect_left(self._order, (hash, key))
+        if position < len(self._order) and self._order[position] == (hash, key):
+            return position
+        return -1
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node at its sorted position."""
+        position = bisect_left(self._order, (hash, key))
+        self._order.insert(position, (hash, key))
+        self._nodes.insert(position, SLNode(key, value, None, hash))
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        position = self._position(key, hash)
+        if position < 0:
+            return False
+
+        del self._order[position]
+        del self._nodes[position]
+        return True
+
+    def contains(self, key: str, hash: int = None, reorder: str = None) -> SLNode:
+        """Return node with matching key, or None if no match. reorder is ignored, the order is fixed."""
+        position = self._position(key, hash)
+        return None if position < 0 else self._nodes[position]
+
+    def comparisons(self, key: str, hash: int = None) -> int:
+        """
+        Return the number of nodes contains() compares looking for key:
+        one per step of the binary search, and the node it lands on.
+        """
+        order, target = self._order, (hash, key)
+        low, high, compared = 0, len(order), 0
+
+        # the steps of bisect_left()
+        while low < high:
+            middle = (low + high) // 2
+            compared += 1
+            if order[middle] < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(order):
+            compared += 1
+        return compared
+
+    def length(self) -> int:
+        """Return the number of nodes in the chain."""
+        return len(self._nodes)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """Initialize an entry for use in a hash map, caching the key's full hash."""
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,335 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Timing benchmarks for the HashMap implementations.
+#              Run with `python benchmarks.py`.
+
+import gc
+import itertools
+import random
+import sys
+import threading
+import time
+
+import hash_map_cache
+import hash_map_concurrent
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+from a6_include import ResizePolicy, fnv1a_hash, hash_function_1, hash_function_2, murmur_hash, siphash
+
+
+def bench_oa_insert(sizes=(1_000, 10_000, 100_000, 1_000_000), function=hash) -> None:
+    """
+    Inserts n distinct keys into an empty open addressing HashMap for each n in sizes
+    and prints the insert throughput. With expected O(1) probing the keys/sec column
+    should stay roughly flat as n grows (resizes included).
+
+    The built-in hash is used by default: the sample hash functions map 'str' + str(i)
+    style keys onto a few hundred values, which measures collisions instead of the map.
+    The garbage collector is paused while timing, as timeit does, so its full-heap
+    passes over millions of entries don't show up as map cost.
+    """
+    print(f"{'keys':>10} {'seconds':>10} {'keys/sec':>12}")
+    for n in sizes:
+        keys = ['str' + str(i) for i in range(n)]
+        m = hash_map_oa.HashMap(11, function)
+
+        gc.disable()
+        start = time.perf_counter()
+        for key in keys:
+            m.put(key, key)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+
+        print(f"{n:>10} {elapsed:>10.3f} {n / elapsed:>12,.0f}")
+
+
+def bench_oa_probing(n=5_000, functions=(hash_function_1, hash_function_2,
+                                          fnv1a_hash, murmur_hash, siphash, hash)) -> None:
+    """
+    Loads the same n keys with every probing strategy and hash function
+    and prints the average and maximum probe length of the resulting tables.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+
+    print(f"{'function':>16} {'probing':>10} {'avg probe':>10} {'max probe':>10}")
+    for function in functions:
+        for probing in hash_map_oa.PROBING_STRATEGIES:
+            m = hash_map_oa.HashMap(11, function, probing=probing)
+            for key in keys:
+                m.put(key, key)
+            average, longest = m.probe_stats()
+            print(f"{function.__name__:>16} {probing:>10} {average:>10.2f} {longest:>10}")
+
+
+def bench_rh_probing(n=100_000, function=hash) -> None:
+    """
+    Compares the probe lengths of the quadratic probing map (max load 0.5)
+    with the Robin Hood map sized to sit just under its 0.9 max load,
+    both holding the same n keys.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+
+    print(f"{'map':>12} {'load':>6} {'avg probe':>10} {'max probe':>10}")
+    for name, m in (('quadratic', hash_map_oa.HashMap(11, function)),
+                    ('robin hood', hash_map_rh.HashMap(int(n / 0.88), function))):
+        for key in keys:
+            m.put(key, key)
+        average, longest = m.probe_stats()
+        print(f"{name:>12} {m.table_load():>6.2f} {average:>10.2f} {longest:>10}")
+
+
+def bench_get_many(n=100_000, batch=500, rounds=20, function=hash_function_2) -> None:
+    """
+    Times looking up batches of keys (half of them missing) with one get() per key
+    against one get_many() per batch, for both HashMaps.
+    """
+    items = [('str' + str(i), i) for i in range(n)]
+    batches = [['str' + str(i) for i in range(start, start + 2 * batch, 2)]
+               for start in range(0, 2 * batch * rounds, 2 * batch)]
+
+    print(f"{'map':>12} {'get':>8} {'get_many':>9}")
+    for name, map_class in (('chaining', hash_map_sc.HashMap), ('open addr.', hash_map_oa.HashMap)):
+        m = map_class.from_items(items, function)
+
+        start = time.perf_counter()
+        for keys in batches:
+            [m.get(key) for key in keys]
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for keys in batches:
+            m.get_many(keys)
+        batched = time.perf_counter() - start
+
+        print(f"{name:>12} {single:>8.3f} {batched:>9.3f}")
+
+
+def bench_incremental_resize(n=300_000, function=hash) -> None:
+    """
+    Inserts n keys one by one and prints the slowest single put(),
+    with the usual all-at-once resizing and with incremental resizing.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+
+    print(f"{'map':>12} {'resize':>12} {'total s':>8} {'worst put ms':>13}")
+    for name, map_class in (('chaining', hash_map_sc.HashMap), ('open addr.', hash_map_oa.HashMap)):
+        for incremental in (False, True):
+            m = map_class(11, function, incremental=incremental)
+            worst = 0.0
+
+            gc.disable()
+            start = time.perf_counter()
+            for key in keys:
+                before = time.perf_counter()
+                m.put(key, key)
+                worst = max(worst, time.perf_counter() - before)
+            elapsed = time.perf_counter() - start
+            gc.enable()
+
+            mode = 'incremental' if incremental else 'all at once'
+            print(f"{name:>12} {mode:>12} {elapsed:>8.2f} {worst * 1000:>13.2f}")
+
+
+def bench_power_of_two(n=200_000, functions=(fnv1a_hash, murmur_hash, hash)) -> None:
+    """
+    Loads n keys into prime capacity and power-of-two capacity open addressing maps
+    and prints the load time and the probe lengths of each.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+
+    print(f"{'function':>16} {'capacity':>10} {'seconds':>8} {'avg probe':>10} {'max probe':>10}")
+    for function in functions:
+        for power_of_two in (False, True):
+            m = hash_map_oa.HashMap(11, function, power_of_two=power_of_two)
+
+            gc.disable()
+            start = time.perf_counter()
+            for key in keys:
+                m.put(key, key)
+            elapsed = time.perf_counter() - start
+            gc.enable()
+
+            average, longest = m.probe_stats()
+            mode = 'pow. of 2' if power_of_two else 'prime'
+            print(f"{function.__name__:>16} {mode:>10} {elapsed:>8.2f} {average:>10.2f} {longest:>10}")
+
+
+def bench_treeify(sizes=(1_000, 4_000, 8_000)) -> None:
+    """
+    Loads n anagrams of one word into a chaining HashMap with hash_function_1,
+    which sends them all to a single bucket, then looks every one of them up.
+    Compares plain linked list chains with chains treeified past 8 nodes.
+    """
+    words = [''.join(letters) for letters in itertools.permutations('abcdefgh')]
+
+    print(f"{'keys':>8} {'chains':>8} {'seconds':>8}")
+    for n in sizes:
+        keys = words[:n]
+        for threshold in (None, 8):
+            m = hash_map_sc.HashMap(11, hash_function_1, treeify_threshold=threshold)
+
+            start = time.perf_counter()
+            for key in keys:
+                m.put(key, key)
+            for key in keys:
+                m.get(key)
+            elapsed = time.perf_counter() - start
+
+            mode = 'sorted' if threshold else 'linked'
+            print(f"{n:>8} {mode:>8} {elapsed:>8.3f}")
+
+
+def bench_self_organizing(n=10_000, lookups=200_000, exponent=1.0, chain_length=8) -> None:
+    """
+    Looks up keys drawn from a Zipf distribution (the key of rank r is looked up
+    in proportion to 1 / r ** exponent) in a chaining HashMap held at about
+    chain_length entries per bucket, with each reorder policy.
+    The hottest keys are inserted first, which leaves them at the back of their chains.
+    Prints the average number of chain entries a get() compared, and the time of the gets.
+    """
+    keys = ['str' + str(rank) for rank in range(n)]
+    weights = [1 / rank ** exponent for rank in range(1, n + 1)]
+    workload = random.Random(261).choices(keys, weights, k=lookups)
+
+    print(f"{'reorder':>14} {'avg visited':>12} {'seconds':>8}")
+    for reorder in (None,) + hash_map_sc.REORDER_POLICIES:
+        maps = []
+        for _ in range(2):
+            m = hash_map_sc.HashMap(n // chain_length, hash, policy=ResizePolicy(chain_length + 1),
+                                    treeify_threshold=None, reorder=reorder)
+            for key in keys:
+                m.put(key, key)
+            maps.append(m)
+
+        # count on one map, time the same lookups on an identical one
+        counted, timed = maps
+        visited = 0
+        for key in workload:
+            visited += counted.nodes_visited(key)
+            counted.get(key)
+
+        start = time.perf_counter()
+        for key in workload:
+            timed.get(key)
+        elapsed = time.perf_counter() - start
+
+        print(f"{reorder or 'none':>14} {visited / lookups:>12.2f} {elapsed:>8.3f}")
+
+
+def bench_concurrent(threads=(1, 2, 4, 8), operations=400_000, reads=0.9, n=10_000) -> None:
+    """
+    Splits operations gets and puts (a reads fraction of them gets) over n keys
+    between the given numbers of threads, and prints the total throughput of a
+    chaining HashMap behind a single lock against the lock-striped ConcurrentHashMap.
+    With the GIL only one thread runs Python code at a time, so extra threads can only
+    add contention; a free-threaded build (python3.13t and later) is where striping pays.
+    """
+    keys = ['str' + str(i) for i in range(n)]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+
+    print(f"{'threads':>8} {'map':>12} {'seconds':>8} {'ops/sec':>12}")
+    for count in threads:
+        workloads = []
+        for thread in range(count):
+            rng = random.Random(thread)
+            workloads.append([(rng.random() < reads, rng.choice(keys)) for _ in range(operations // count)])
+
+        locked = hash_map_sc.HashMap(n, hash)
+        lock = threading.Lock()
+
+        def run_locked(workload):
+            for read, key in workload:
+                with lock:
+                    if read:
+                        locked.get(key)
+                    else:
+                        locked.put(key, key)
+
+        striped = hash_map_concurrent.ConcurrentHashMap(n, hash)
+
+        def run_striped(workload):
+            for read, key in workload:
+                if read:
+                    striped.get(key)
+                else:
+                    striped.put(key, key)
+
+        for name, run in (('one lock', run_locked), ('striped', run_striped)):
+            workers = [threading.Thread(target=run, args=(workload,)) for workload in workloads]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            print(f"{count:>8} {name:>12} {elapsed:>8.3f} {operations / elapsed:>12,.0f}")
+
+
+def bench_cache(capacity=1_000, n=100_000, lookups=200_000, exponent=0.8, scan=0.3) -> None:
+    """
+    Memoizes a workload of lookups in an LRUCache of capacity entries, with and
+    without TinyLFU admission, and prints the hit ratio and the time taken.
+    Most lookups draw from n keys with Zipf popularity (see bench_self_organizing),
+    a scan fraction of them are one-off keys that are never asked for again.
+    """
+    keys = ['str' + str(rank) for rank in range(n)]
+    weights = [1 / rank ** exponent for rank in range(1, n + 1)]
+    rng = random.Random(261)
+    popular = rng.choices(keys, weights, k=lookups)
+    workload = [('scan' + str(i) if rng.random() < scan else key) for i, key in enumerate(popular)]
+
+    print(f"{'admission':>10} {'hit ratio':>10} {'evictions':>10} {'seconds':>8}")
+    for admission in (None,) + hash_map_cache.ADMISSION_POLICIES:
+        cache = hash_map_cache.LRUCache(capacity, function=hash, admission=admission)
+        start = time.perf_counter()
+        for key in workload:
+            if cache.get(key) is None:
+                cache.put(key, key)
+        elapsed = time.perf_counter() - start
+        print(f"{admission or 'none':>10} {cache.hit_ratio():>10.3f} {cache.evictions:>10} {elapsed:>8.3f}")
+
+
+if __name__ == "__main__":
+
+    print("\nOA - insert throughput")
+    print("----------------------")
+    bench_oa_insert()
+
+    print("\nOA - probe lengths by strategy")
+    print("------------------------------")
+    bench_oa_probing()
+
+    print("\nRH - probe lengths against quadratic probing")
+    print("--------------------------------------------")
+    bench_rh_probing()
+
+    print("\nBatched lookups")
+    print("---------------")
+    bench_get_many()
+
+    print("\nIncremental resizing")
+    print("--------------------")
+    bench_incremental_resize()
+
+    print("\nPrime against power-of-two capacities")
+    print("-------------------------------------")
+    bench_power_of_two()
+
+    print("\nTreeified chains under colliding keys")
+    print("-------------------------------------")
+    bench_treeify()
+
+    print("\nSelf-organizing chains under Zipf lookups")
+    print("-----------------------------------------")
+    bench_self_organizing()
+
+    print("\nThreads sharing one map")
+    print("-----------------------")
+    bench_concurrent()
+
+    print("\nLRU cache with and without TinyLFU admission")
+    print("--------------------------------------------")
+    bench_cache()
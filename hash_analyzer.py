@@ -0,0 +1,226 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Reports how evenly a hash function spreads a key corpus over
+#              a range of table capacities, for both HashMap implementations.
+#              Power-of-two capacities are indexed as the maps' power_of_two mode does.
+#
+#              python hash_analyzer.py keys.txt --function hash_function_1
+
+import argparse
+import itertools
+import sys
+import time
+
+import a6_include
+
+DEFAULT_CAPACITIES = (53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593,
+                      64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+class CapacityReport:
+    """
+    Bucket statistics of one hash function / key corpus at one capacity
+    """
+
+    def __init__(self, capacity: int, counts: list, probe_length: int) -> None:
+        """Summarize the number of keys that landed in each bucket."""
+        keys = sum(counts)
+        expected = keys / capacity
+
+        self.capacity = capacity
+        self.keys = keys
+        self.occupied = capacity - counts.count(0)
+
+        # keys that share a bucket with an earlier key
+        self.collision_rate = (keys - self.occupied) / keys if keys else 0.0
+
+        # separate chaining: the longest linked list
+        self.longest_chain = max(counts) if counts else 0
+
+        # open addressing: longest quadratic probe sequence, None when the keys don't fit
+        self.longest_probe = probe_length
+
+        # chi-square against a uniform spread, it should be close to capacity - 1
+        self.chi_square = sum((count - expected) ** 2 for count in counts) / expected if keys else 0.0
+
+        # histogram of bucket sizes: histogram[n] buckets hold n keys
+        self.histogram = [0] * (self.longest_chain + 1)
+        for count in counts:
+            self.histogram[count] += 1
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        probe = '-' if self.longest_probe is None else str(self.longest_probe)
+        return (f"{self.capacity:>8} {self.keys / self.capacity:>6.2f} {self.chi_square / (self.capacity - 1):>8.2f} "
+                f"{self.collision_rate:>10.2%} {self.longest_chain:>6} {probe:>6}")
+
+
+def load_keys(source) -> list:
+    """
+    Returns the key corpus as a list of strings.
+    source is either a path to a file with one key per line or an iterable of keys.
+    """
+    if isinstance(source, str):
+        with open(source, encoding='utf-8') as file:
+            return [line.rstrip('\n') for line in file if line.strip()]
+    return [str(key) for key in source]
+
+
+def time_hash(function, keys: list) -> float:
+    """
+    Returns the average time the hash function takes per key, in nanoseconds.
+    """
+    start = time.perf_counter_ns()
+    for key in keys:
+        function(key)
+    return (time.perf_counter_ns() - start) / max(len(keys), 1)
+
+
+def valid_capacity(capacity: int) -> bool:
+    """
+    Returns True if capacity is a prime or a power of two, at least 2: the capacities
+    the maps use, and the only ones whose probe sequences are sure to find a free
+    bucket in a table that is at most half full.
+    """
+    return capacity >= 2 and (capacity & (capacity - 1) == 0 or a6_include.is_prime(capacity))
+
+
+def longest_probe(hashes: list, capacity: int) -> int:
+    """
+    Inserts the hashes into an empty table of the given capacity with quadratic probing,
+    like hash_map_oa.HashMap, and returns the longest probe sequence any insert needed.
+    Power-of-two capacities probe with triangular numbers, since j ** 2 offsets only
+    reach a fraction of their buckets; their hashes are expected to be mixed already.
+    Other capacities aren't probed at all, see valid_capacity(): j ** 2 offsets may
+    never reach a free bucket there. Returns None when the keys would not fit at the 0.5 load limit the map enforces.
+    """
+    if len(hashes) > capacity // 2:
+        return None
+    if not valid_capacity(capacity):
+        raise ValueError(f"capacity must be a prime or a power of two, not {capacity}")
+
+    power_of_two = capacity & (capacity - 1) == 0
+    taken = bytearray(capacity)
+    longest = 0
+    for hash in hashes:
+        index, length = hash % capacity, 1
+        while taken[index]:
+            # triangular offsets step by j, square offsets by j ** 2 - (j - 1) ** 2 == 2j - 1
+            index = (index + (length if power_of_two else 2 * length - 1)) % capacity
+            length += 1
+        taken[index] = 1
+        longest = max(longest, length)
+    return longest
+
+
+def analyze(function, source, capacities=DEFAULT_CAPACITIES) -> (float, list):
+    """
+    Analyzes a hash function on a key corpus (a file path or an iterable of keys).
+    Returns the hash time in ns per key and a CapacityReport per capacity.
+    Every capacity must be a prime or a power of two (see valid_capacity()),
+    as the maps' capacities are.
+    """
+    capacities = list(capacities)
+    for capacity in capacities:
+        if not valid_capacity(capacity):
+            raise ValueError(f"capacities must be primes or powers of two, at least 2, not {capacity}")
+
+    keys = load_keys(source)
+    ns_per_key = time_hash(function, keys)
+
+    # duplicate keys always share a bucket, they say nothing about the hash function
+    hashes = [function(key) for key in dict.fromkeys(keys)]
+
+    # power-of-two tables run hashes through mix_hash and index with the low bits, as the maps do
+    mixed = [a6_include.mix_hash(hash) for hash in hashes]
+
+    reports = []
+    for capacity in capacities:
+        power_of_two = capacity & (capacity - 1) == 0
+        table_hashes = mixed if power_of_two else hashes
+
+        counts = [0] * capacity
+        for hash in table_hashes:
+            counts[hash % capacity] += 1
+        reports.append(CapacityReport(capacity, counts, longest_probe(table_hashes, capacity)))
+
+    return ns_per_key, reports
+
+
+def print_report(function, source, capacities=DEFAULT_CAPACITIES, histogram: bool = False) -> None:
+    """
+    Prints the analysis of a hash function on a key corpus, one capacity per line,
+    followed by its bucket occupancy histogram when histogram is True.
+    A chi-square / df close to 1 means a uniform spread, much larger means clustering.
+    """
+    ns_per_key, reports = analyze(function, source, capacities)
+
+    print(f"{function.__name__}: {ns_per_key:.0f} ns per key")
+    print(f"{'capacity':>8} {'load':>6} {'chi2/df':>8} {'collisions':>10} {'chain':>6} {'probe':>6}")
+    for report in reports:
+        print(report)
+        if histogram:
+            print(' ' * 9 + 'buckets holding n keys: ' +
+                  ', '.join(f"{n}: {buckets}" for n, buckets in enumerate(report.histogram) if buckets))
+
+
+def main() -> None:
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Report hash function quality on a key corpus.")
+    parser.add_argument('keys', help="file with one key per line")
+    parser.add_argument('--function', action='append',
+                        help="name of a hash function in a6_include (repeatable, default: all)")
+    parser.add_argument('--capacity', type=int, action='append',
+                        help="table capacity to test, a prime or a power of two (repeatable)")
+    parser.add_argument('--histogram', action='store_true',
+                        help="print the bucket occupancy histogram of every capacity")
+    args = parser.parse_args()
+
+    names = args.function or ['hash_function_1', 'hash_function_2', 'fnv1a_hash',
+                              'murmur_hash', 'siphash', 'builtin_hash']
+    capacities = args.capacity or DEFAULT_CAPACITIES
+    for capacity in capacities:
+        if not valid_capacity(capacity):
+            parser.error(f"--capacity must be a prime or a power of two, at least 2, not {capacity}")
+
+    keys = load_keys(args.keys)
+    for name in names:
+        print_report(getattr(a6_include, name), keys, capacities, args.histogram)
+        print()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    # with arguments, run as the command line tool
+    if len(sys.argv) > 1:
+        main()
+        sys.exit()
+
+    print("\nanalyze example 1")
+    print("-----------------")
+    keys = ['str' + str(i) for i in range(200)]
+    for function in (a6_include.hash_function_1, a6_include.fnv1a_hash):
+        ns_per_key, reports = analyze(function, keys, (97, 389, 128, 512))
+        for report in reports:
+            print(function.__name__, report.capacity, report.occupied, report.longest_chain,
+                  report.longest_probe, round(report.chi_square / (report.capacity - 1), 2))
+
+    print("\nanalyze example 2")
+    print("-----------------")
+    # neither is a capacity the maps use, and quadratic probing at 60 can loop forever
+    anagrams = [''.join(letters) for letters in itertools.permutations('abcde')][:28]
+    for capacities in ((1,), (60,)):
+        try:
+            analyze(a6_include.hash_function_1, anagrams, capacities)
+        except ValueError as error:
+            print('ValueError:', error)
+    print(valid_capacity(2), valid_capacity(61), valid_capacity(64), valid_capacity(100))
+
+    print("\nprint_report example 1")
+    print("----------------------")
+    print_report(a6_include.hash_function_2, keys, (53, 64), histogram=True)
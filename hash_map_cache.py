@@ -0,0 +1,411 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Bounded LRU cache on top of the separate chaining HashMap,
+#              with optional TinyLFU admission and hit/miss counters.
+
+import sys
+
+from a6_include import DynamicArray, fnv1a_hash, hash_function_1, mix_hash
+from hash_map_sc import HashMap
+
+# ways a full cache can decide whether a new key gets in, see LRUCache
+ADMISSION_POLICIES = ('tinylfu',)
+
+
+def _default_sizeof(key: str, value: object) -> int:
+    """
+    Returns the shallow size in bytes of a key and its value.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class _CacheNode:
+    """
+    Entry of an LRUCache: the value the HashMap holds for a key, and at the same
+    time a node of the cache's doubly linked recency list.
+    """
+    # no per-node __dict__, a cache holds one node per key
+    __slots__ = ('key', 'value', 'size', 'prev', 'next')
+
+    def __init__(self, key: str = None, value: object = None, size: int = 0) -> None:
+        """Initialize a node, linked to nothing yet."""
+        self.key = key
+        self.value = value
+        self.size = size
+        self.prev = None
+        self.next = None
+
+
+class _FrequencySketch:
+    """
+    Count-min sketch of how often keys were seen lately, as TinyLFU uses it:
+    depth rows of small counters (at most 15), a key counts in one counter per row
+    and its frequency is the smallest of them. Collisions only ever add, so it
+    overestimates now and then but never underestimates.
+    Once sample_size keys were counted every counter is halved, so keys that were
+    popular a long time ago fade out.
+    """
+
+    def __init__(self, width: int, depth: int = 4) -> None:
+        """Initialize a sketch with depth rows of (at least) width counters."""
+        self._width = 16
+        while self._width < width:
+            self._width *= 2
+
+        self._depth = depth
+        self._counters = bytearray(self._width * depth)
+        self._sample_size = 10 * self._width
+        self._additions = 0
+
+    def _indices(self, hash: int) -> list:
+        """
+        Returns the counter of the hash in each row. The rows index with
+        h1 + row * h2, two hashes taken from one mixed hash.
+        """
+        mixed = mix_hash(hash)
+        h1, h2 = mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+        width, mask = self._width, self._width - 1
+        return [row * width + ((h1 + row * h2) & mask) for row in range(self._depth)]
+
+    def increment(self, hash: int) -> None:
+        """
+        Counts one more sighting of the key with the given hash.
+        """
+        counters = self._counters
+        for index in self._indices(hash):
+            if counters[index] < 15:
+                counters[index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, hash: int) -> int:
+        """
+        Returns how often the key with the given hash was seen (an estimate).
+        """
+        counters = self._counters
+        return min([counters[index] for index in self._indices(hash)])
+
+    def _age(self) -> None:
+        """
+        Halves every counter.
+        """
+        self._counters = bytearray(count >> 1 for count in self._counters)
+        self._additions //= 2
+
+
+class LRUCache:
+    """
+    Cache of at most max_entries keys and/or max_bytes bytes that evicts the least
+    recently used keys to make room, for memoizing expensive lookups without
+    the memo growing forever.
+
+    The keys live in a separate chaining HashMap whose values are nodes of a doubly
+    linked list ordered from most to least recently used: get() and put() find
+    the node in the map and unlink and relink it at the front, and eviction takes
+    the node at the back, so both are O(1) (expected, like the map).
+
+    With admission='tinylfu' a full cache doesn't take every new key: a count-min
+    sketch estimates how often each key was asked for lately, and a new key only
+    gets in if it was asked for more often than the key it would evict. One-off
+    keys, as in a scan, then no longer push out the ones that keep coming back.
+    Every key counts once per access: a get() counts it, and so does a put(), unless
+    it puts the key the last get() missed. The sketch hashes the keys with its own
+    sketch_function, so that keys the map's function sends to one bucket (anagrams,
+    with hash_function_1) don't share their counters as well.
+
+    Every get() counts a hit or a miss, see hits, misses and hit_ratio().
+    """
+
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 function: callable = hash_function_1,
+                 sizeof: callable = None,
+                 admission: str = None,
+                 sketch_function: callable = fnv1a_hash,
+                 **options) -> None:
+        """
+        Initialize a new, empty cache holding at most max_entries keys and
+        at most max_bytes bytes, at least one of the two has to be given.
+        sizeof(key, value) gives the bytes an entry takes, by default the shallow
+        sys.getsizeof() of the key and the value. Entries bigger than max_bytes
+        are not cached at all.
+        sketch_function hashes the keys for TinyLFU admission.
+        function and the options are those of hash_map_sc.HashMap.
+        """
+        if max_entries is None and max_bytes is None:
+            raise ValueError("an LRUCache needs max_entries, max_bytes or both")
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        if admission is not None and admission not in ADMISSION_POLICIES:
+            raise ValueError(f"admission must be None or one of {ADMISSION_POLICIES}, not {admission!r}")
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof if sizeof is not None else _default_sizeof
+        self._hash_function = function
+
+        self._map = HashMap(max_entries + 1 if max_entries is not None else 11, function, **options)
+        self._bytes = 0
+
+        # sentinel of the circular recency list: head.next is the most recently used node
+        self._head = _CacheNode()
+        self._head.prev = self._head.next = self._head
+
+        self._sketch = None
+        if admission == 'tinylfu':
+            self._sketch = _FrequencySketch(max_entries if max_entries is not None else 1024)
+        self._sketch_function = sketch_function
+
+        # (key, sketch hash) of the key the last get() missed, which it already counted
+        self._missed = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        pairs = ', '.join(f"({node.key}: {node.value})" for node in self._nodes())
+        return 'LRU [' + pairs + ']'
+
+    # ------------- the recency list ------------- #
+
+    def _link_front(self, node: _CacheNode) -> None:
+        """
+        Links node in as the most recently used one.
+        """
+        head = self._head
+        node.prev, node.next = head, head.next
+        head.next.prev = node
+        head.next = node
+
+    @staticmethod
+    def _unlink(node: _CacheNode) -> None:
+        """
+        Takes node out of the recency list.
+        """
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    def _nodes(self):
+        """
+        Yields every node, from the most to the least recently used.
+        """
+        node = self._head.next
+        while node is not self._head:
+            yield node
+            node = node.next
+
+    def _over_budget(self, extra_entries: int, extra_bytes: int) -> bool:
+        """
+        Returns True if the cache would hold too much with extra_entries and extra_bytes more.
+        """
+        return ((self._max_entries is not None and self._map.get_size() + extra_entries > self._max_entries)
+                or (self._max_bytes is not None and self._bytes + extra_bytes > self._max_bytes))
+
+    def _discard(self, node: _CacheNode) -> None:
+        """
+        Removes node from the recency list and the map.
+        """
+        self._unlink(node)
+        self._map.remove(node.key)
+        self._bytes -= node.size
+
+    def _evict(self, extra_entries: int, extra_bytes: int) -> None:
+        """
+        Evicts the least recently used entries until extra_entries and extra_bytes more fit.
+        """
+        while self._head.prev is not self._head and self._over_budget(extra_entries, extra_bytes):
+            self._discard(self._head.prev)
+            self._evictions += 1
+
+    # ------------- cache operations ------------- #
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value cached for key and marks it as the most recently used,
+        or None if key is not cached.
+        """
+        if self._sketch is not None:
+            hash = self._sketch_function(key)
+            self._sketch.increment(hash)
+
+        node = self._map.get(key)
+        if node is None:
+            self._misses += 1
+            if self._sketch is not None:
+                self._missed = (key, hash)
+            return None
+
+        self._hits += 1
+        self._unlink(node)
+        self._link_front(node)
+        return node.value
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Caches value for key as the most recently used entry,
+        first evicting the least recently used ones if it doesn't fit.
+        """
+        size = self._sizeof(key, value)
+        node = self._map.get(key)
+
+        # too big to ever fit, and an old value would be stale
+        if self._max_bytes is not None and size > self._max_bytes:
+            if node is not None:
+                self._discard(node)
+            self._rejections += 1
+            return
+
+        if node is not None:
+            self._unlink(node)
+            self._bytes -= node.size
+            node.value, node.size = value, size
+            self._evict(0, size)
+            self._link_front(node)
+            self._bytes += size
+            return
+
+        if self._sketch is not None:
+            # the usual get() miss then put() of a key is one access, counted by get()
+            if self._missed is not None and self._missed[0] == key:
+                hash = self._missed[1]
+            else:
+                hash = self._sketch_function(key)
+                self._sketch.increment(hash)
+            self._missed = None
+
+            # a full cache lets the new key in only if it beats the key it would evict
+            victim = self._head.prev
+            if (victim is not self._head and self._over_budget(1, size)
+                    and self._sketch.frequency(hash) <= self._sketch.frequency(self._sketch_function(victim.key))):
+                self._rejections += 1
+                return
+
+        self._evict(1, size)
+        node = _CacheNode(key, value, size)
+        self._map.put(key, node)
+        self._link_front(node)
+        self._bytes += size
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is cached. Counts neither a hit nor a miss and changes no order.
+        """
+        return self._map.contains_key(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Drops key from the cache, if it is cached.
+        """
+        node = self._map.get(key)
+        if node is not None:
+            self._discard(node)
+
+    def clear(self) -> None:
+        """
+        Drops every entry. The counters keep counting.
+        """
+        self._map.clear()
+        self._head.prev = self._head.next = self._head
+        self._bytes = 0
+
+    def get_size(self) -> int:
+        """
+        Returns the number of cached entries.
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Returns the bytes the cached entries take, as sizeof counts them.
+        """
+        return self._bytes
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of the cached (key, value) pairs, most recently used first.
+        """
+        return DynamicArray([(node.key, node.value) for node in self._nodes()], copy=False)
+
+    # ------------- counters ------------- #
+
+    @property
+    def hits(self) -> int:
+        """
+        The number of get() calls that found their key.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        The number of get() calls that didn't.
+        """
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """
+        The number of entries evicted to make room for others.
+        """
+        return self._evictions
+
+    @property
+    def rejections(self) -> int:
+        """
+        The number of put() calls that cached nothing: the entry was bigger
+        than max_bytes, or TinyLFU admission turned the key away.
+        """
+        return self._rejections
+
+    def hit_ratio(self) -> float:
+        """
+        Returns the share of get() calls that were hits, 0.0 before the first one.
+        """
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from a6_include import hash_function_2
+
+    print("\nLRUCache example 1")
+    print("------------------")
+    cache = LRUCache(3, function=hash_function_2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key.upper())
+    cache.get('a')
+    cache.put('d', 'D')
+    print(cache, cache.get_size(), cache.evictions)
+    print(cache.get('b'), cache.get('c'), cache.hits, cache.misses, cache.hit_ratio())
+
+    print("\nLRUCache example 2")
+    print("------------------")
+    cache = LRUCache(max_bytes=100, sizeof=lambda key, value: len(value))
+    for i in range(10):
+        cache.put('key' + str(i), 'x' * (i * 5))
+    print(cache, cache.get_size(), cache.get_bytes(), cache.evictions)
+    cache.put('big', 'x' * 101)
+    print(cache.contains_key('big'), cache.rejections)
+
+    print("\nLRUCache example 3")
+    print("------------------")
+    # a few hot keys keep coming back, a scan of one-off keys runs in between
+    for admission in (None, 'tinylfu'):
+        cache = LRUCache(40, admission=admission)
+        for i in range(20_000):
+            key = 'hot' + str(i % 60) if i % 2 == 0 else 'scan' + str(i)
+            if cache.get(key) is None:
+                cache.put(key, i)
+        print(admission, round(cache.hit_ratio(), 3), cache.evictions, cache.rejections)
@@ -0,0 +1,329 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Thread-safe HashMap using separate chaining, with lock striping
+#              for writers and lock-free reads.
+
+import threading
+
+from a6_include import DynamicArray, ItemsView, KeysView, ResizePolicy, ValuesView, hash_function_1, next_prime
+
+# grow at load 1.0, never shrink
+DEFAULT_POLICY = ResizePolicy(1.0)
+
+# an empty chain, shared by every empty bucket
+_EMPTY_CHAIN = ()
+
+
+class _Table:
+    """
+    The buckets of a ConcurrentHashMap. Each bucket is an immutable chain:
+    a tuple of hash, key, value, hash, key, value, ... A write builds a new tuple
+    and stores it in the bucket, so a reader holding the old one sees it unchanged.
+    """
+    __slots__ = ('capacity', 'buckets')
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize a table of capacity empty buckets."""
+        self.capacity = capacity
+        self.buckets = [_EMPTY_CHAIN] * capacity
+
+
+class ConcurrentHashMap:
+    """
+    HashMap that any number of threads can use at once.
+
+    Writers lock only a stripe of the buckets: bucket i is guarded by lock i % stripes,
+    so writers to different stripes don't wait for each other. Readers (get(),
+    contains_key()) take no lock at all: a chain is never changed in place, a write
+    replaces the whole tuple, and storing one list item is atomic, so a reader sees
+    a bucket either before or after a write, never halfway through.
+
+    A resize takes every stripe lock, fills a new table from the old one and then
+    publishes it with a single assignment to self._table. Readers keep using the
+    old table until then (it no longer changes), and a writer that locked a stripe
+    of the old table sees that the table was replaced and starts over on the new one.
+    The table grows as the policy says, but never shrinks.
+
+    Iterating the map (keys(), values(), items()) is weakly consistent, as in Java's
+    ConcurrentHashMap: it never fails, and reflects each bucket as it was when the
+    loop got to it. get_keys_and_values() locks every stripe for a point-in-time copy.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 policy: ResizePolicy = None) -> None:
+        """
+        Initialize new ConcurrentHashMap with capacity buckets (the next prime)
+        guarded by stripes locks.
+        """
+        self._hash_function = function
+        self._policy = policy if policy is not None else DEFAULT_POLICY
+
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        # entries in the buckets of each stripe, only changed under the stripe's lock
+        self._counts = [0] * stripes
+
+        self._table = _Table(next_prime(capacity))
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        table = self._table
+        out = ''
+        for i, chain in enumerate(table.buckets):
+            pairs = ', '.join(f"({chain[position + 1]}: {chain[position + 2]})"
+                              for position in range(0, len(chain), 3))
+            out += str(i) + ': [' + pairs + ']\n'
+        return out
+
+    @staticmethod
+    def _position(chain: tuple, key: str, hash: int) -> int:
+        """
+        Returns the position of the hash of key in a chain, or -1 if the chain doesn't hold key.
+        """
+        for position in range(0, len(chain), 3):
+            if chain[position] == hash and chain[position + 1] == key:
+                return position
+        return -1
+
+    def _lock_all(self) -> None:
+        """
+        Takes every stripe lock, always in the same order so two threads doing it can't deadlock.
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Releases every stripe lock.
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def get_size(self) -> int:
+        """
+        Returns the number of key/value pairs in the hash map.
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Returns the capacity of the hash map.
+        """
+        return self._table.capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+        """
+        return self.get_size() / self._table.capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        """
+        return self._table.buckets.count(_EMPTY_CHAIN)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map.
+        If the given key already exists in the hash map,
+        its associated value must be replaced with the new value.
+        If the given key is not in the hash map, a new key/value pair must be added.
+        """
+        hash = self._hash_function(key)
+
+        while True:
+            table = self._table
+            index = hash % table.capacity
+            stripe = index % len(self._locks)
+
+            with self._locks[stripe]:
+                # a resize got in between: the bucket has moved, look it up again
+                if self._table is not table:
+                    continue
+
+                chain = table.buckets[index]
+                position = self._position(chain, key, hash)
+                if position >= 0:
+                    table.buckets[index] = chain[:position + 2] + (value,) + chain[position + 3:]
+                    return
+
+                table.buckets[index] = chain + (hash, key, value)
+                self._counts[stripe] += 1
+                break
+
+        # grow outside of the stripe lock, the resize needs all of them
+        if self.get_size() > self._policy.max_load * table.capacity:
+            self._grow(table)
+
+    def _grow(self, table: _Table) -> None:
+        """
+        Grows the table by the policy's growth factor, unless another thread already replaced it.
+        """
+        self._lock_all()
+        try:
+            if self._table is table:
+                self._rehash(self._policy.grown_capacity(table.capacity))
+        finally:
+            self._unlock_all()
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Moves every entry into a new table of new_capacity (the next prime) buckets
+        and publishes it. The caller holds every stripe lock.
+        """
+        new_table = _Table(next_prime(new_capacity))
+        buckets, capacity = new_table.buckets, new_table.capacity
+
+        # the hashes are stored, keys are never run through the hash function again
+        for chain in self._table.buckets:
+            for position in range(0, len(chain), 3):
+                index = chain[position] % capacity
+                buckets[index] += chain[position:position + 3]
+
+        self._table = new_table
+
+        # entries changed stripes along with their buckets
+        counts = [0] * len(self._locks)
+        for index, chain in enumerate(buckets):
+            counts[index % len(counts)] += len(chain) // 3
+        self._counts[:] = counts
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        All existing key/value pairs must remain in the new hash map,
+        and all hash table links must be rehashed.
+        """
+        self._lock_all()
+        try:
+            if new_capacity >= 1 and new_capacity >= self.get_size():
+                self._rehash(new_capacity)
+        finally:
+            self._unlock_all()
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns None.
+        """
+        hash = self._hash_function(key)
+        table = self._table
+        chain = table.buckets[hash % table.capacity]
+
+        for position in range(0, len(chain), 3):
+            if chain[position] == hash and chain[position + 1] == key:
+                return chain[position + 2]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map.
+        Otherwise it returns False.
+        """
+        hash = self._hash_function(key)
+        table = self._table
+        return self._position(table.buckets[hash % table.capacity], key, hash) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing (no exception needs to be raised).
+        """
+        hash = self._hash_function(key)
+
+        while True:
+            table = self._table
+            index = hash % table.capacity
+            stripe = index % len(self._locks)
+
+            with self._locks[stripe]:
+                if self._table is not table:
+                    continue
+
+                chain = table.buckets[index]
+                position = self._position(chain, key, hash)
+                if position >= 0:
+                    table.buckets[index] = chain[:position] + chain[position + 3:]
+                    self._counts[stripe] -= 1
+                return
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+        It does not change the underlying hash table capacity.
+        """
+        self._lock_all()
+        try:
+            self._table = _Table(self._table.capacity)
+            self._counts[:] = [0] * len(self._locks)
+        finally:
+            self._unlock_all()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map, all as they were at one moment: writers wait while it runs.
+        """
+        self._lock_all()
+        try:
+            pairs = list(self._iter_entries())
+        finally:
+            self._unlock_all()
+        return DynamicArray(pairs, copy=False)
+
+    def keys(self) -> KeysView:
+        """
+        Returns a live, weakly consistent view of the keys in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a live, weakly consistent view of the values in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a live, weakly consistent view of the (key, value) pairs in the hash map.
+        """
+        return ItemsView(self)
+
+    def _iter_entries(self):
+        """
+        Yields the (key, value) pair of every entry, bucket by bucket.
+        Each bucket is read once, as it is when the loop gets to it.
+        """
+        for chain in self._table.buckets:
+            for position in range(0, len(chain), 3):
+                yield chain[position + 1], chain[position + 2]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nConcurrentHashMap example 1")
+    print("---------------------------")
+    m = ConcurrentHashMap(11, hash_function_1)
+
+    def writer(start: int) -> None:
+        for i in range(start, start + 1000):
+            m.put('key' + str(i), i)
+        for i in range(start, start + 1000, 2):
+            m.remove('key' + str(i))
+
+    threads = [threading.Thread(target=writer, args=(start,)) for start in range(0, 8000, 1000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_capacity(), m.get('key1'), m.get('key7999'), m.contains_key('key0'))
+    print(len(m.get_keys_and_values()), sum(m.values()))
@@ -0,0 +1,595 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing HashMap stored in two files instead of in memory:
+#              a memory-mapped file of fixed-width bucket records and an append-only
+#              heap file holding the keys and values.
+
+import io
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+from a6_include import HashEntry, ResizePolicy, function_identity, snapshot_function
+from hash_map_oa import DELETED, EMPTY, HashMap
+
+# the slot file starts with a header page, the bucket records follow it
+_HEADER_SIZE = 4096
+_SETTINGS_OFFSET = 64
+
+# magic, format version, byte order of the records (0 little, 1 big), length of the settings
+_HEADER = struct.Struct('<4sBB2xI')
+_MAGIC = b'A6DM'
+_VERSION = 1
+
+# a record is four native 64-bit words: hash, key offset, value offset and
+# a last word whose first byte is the control byte of the bucket
+_RECORD_SIZE = 32
+
+# heap records are a 64-bit little-endian length followed by that many bytes;
+# one read of this size gets most keys and values whole
+_HEAP_READ = 256
+
+
+class _SlotFile:
+    """
+    A slot file mapped into memory (or a shared memory block laid out like one), with
+    views of its header counters and of each record field as a column: control[i],
+    hashes[i], key_offsets[i] and value_offsets[i] are the fields of bucket i, read and
+    written in place. Whatever follows the records is the heap view.
+    """
+
+    def __init__(self, buffer, close: callable, name: str = '') -> None:
+        """
+        Wraps a buffer holding a slot file. close is called once the views are released.
+        """
+        self.name = name
+        self._buffer = buffer
+        self._close = close
+        self.view = memoryview(buffer)
+        magic, version, byteorder, _ = _HEADER.unpack_from(self.view)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"{name} is not a DiskHashMap slot file")
+        if byteorder != (sys.byteorder == 'big'):
+            self.close()
+            raise ValueError(f"{name} was written on a machine of the other byte order")
+
+        # capacity, size, tombstones
+        self.counters = self.view[16:40].cast('Q')
+        self.capacity = self.counters[0]
+
+        end = _HEADER_SIZE + _RECORD_SIZE * self.capacity
+        self.words = self.view[_HEADER_SIZE:end].cast('Q')
+        self.hashes = self.words[0::4]
+        self.key_offsets = self.words[1::4]
+        self.value_offsets = self.words[2::4]
+        self.control = self.view[_HEADER_SIZE + 24:end:_RECORD_SIZE]
+        self.heap = self.view[end:]
+
+    @staticmethod
+    def size(capacity: int) -> int:
+        """
+        Returns the size of the header and records of a table of capacity buckets.
+        """
+        return _HEADER_SIZE + _RECORD_SIZE * capacity
+
+    @staticmethod
+    def format(buffer, capacity: int, settings: bytes) -> None:
+        """
+        Writes the header and capacity empty bucket records at the start of a zeroed buffer.
+        """
+        if _SETTINGS_OFFSET + len(settings) > _HEADER_SIZE:
+            raise ValueError("the DiskHashMap settings don't fit in the slot file header")
+
+        view = memoryview(buffer)
+        _HEADER.pack_into(view, 0, _MAGIC, _VERSION, sys.byteorder == 'big', len(settings))
+        struct.pack_into('=QQQ', view, 16, capacity, 0, 0)
+        view[_SETTINGS_OFFSET:_SETTINGS_OFFSET + len(settings)] = settings
+
+        # every control byte starts EMPTY, set a block of buckets at a time
+        control = view[_HEADER_SIZE + 24:_SlotFile.size(capacity):_RECORD_SIZE]
+        block = bytes([EMPTY]) * min(capacity, 1 << 20)
+        for start in range(0, capacity, len(block)):
+            stop = min(start + len(block), capacity)
+            control[start:stop] = block[:stop - start]
+        control.release()
+        view.release()
+
+    @classmethod
+    def map(cls, path: str, readonly: bool = False) -> "_SlotFile":
+        """
+        Maps an existing slot file.
+        """
+        with open(path, 'rb' if readonly else 'r+b') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        return cls(mapping, mapping.close, path)
+
+    @classmethod
+    def create(cls, path: str, capacity: int, settings: bytes) -> "_SlotFile":
+        """
+        Writes a slot file of capacity empty buckets under a temporary name (path + '.new')
+        and maps it. path itself is left alone until install() renames the file over it.
+        """
+        temporary = path + '.new'
+        with open(temporary, 'w+b') as file:
+            file.truncate(cls.size(capacity))
+            mapping = mmap.mmap(file.fileno(), 0)
+        cls.format(mapping, capacity, settings)
+
+        return cls(mapping, mapping.close, temporary)
+
+    def install(self, path: str) -> None:
+        """
+        Writes a slot file made by create() through to the disk and only then renames it
+        over path, so after a crash path holds either the table it replaced or this one,
+        never part of one. A mapping of the file it replaces keeps working until it is closed.
+        """
+        # msync the mapped pages, then fsync the file for its size and anything msync missed
+        self.flush()
+        with open(self.name, 'r+b') as file:
+            os.fsync(file.fileno())
+
+        os.replace(self.name, path)
+
+        # and the directory entry the rename changed
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        self.name = path
+
+    def settings(self) -> bytes:
+        """
+        Returns the pickled settings stored in the header.
+        """
+        length = _HEADER.unpack_from(self.view)[3]
+        return bytes(self.view[_SETTINGS_OFFSET:_SETTINGS_OFFSET + length])
+
+    def write_settings(self, settings: bytes) -> None:
+        """
+        Stores pickled settings in the header.
+        """
+        if _SETTINGS_OFFSET + len(settings) > _HEADER_SIZE:
+            raise ValueError("the DiskHashMap settings don't fit in the slot file header")
+        _HEADER.pack_into(self.view, 0, _MAGIC, _VERSION, sys.byteorder == 'big', len(settings))
+        self.view[_SETTINGS_OFFSET:_SETTINGS_OFFSET + len(settings)] = settings
+
+    def flush(self) -> None:
+        """
+        Writes a mapped slot file through to the disk.
+        """
+        self._buffer.flush()
+
+    def close(self) -> None:
+        """
+        Releases the views, then the buffer.
+        """
+        for name in ('heap', 'control', 'value_offsets', 'key_offsets', 'hashes', 'words', 'counters', 'view'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._close()
+
+
+class DiskHashMap(HashMap):
+    """
+    Open addressing HashMap (see hash_map_oa.HashMap, whose probing, prime or power-of-two
+    capacities and resize policies it uses unchanged) kept in two files rather than in memory.
+
+    path is a slot file: a header page, then one 32-byte record per bucket holding the
+    bucket's hash, the heap offsets of its key and value, and its control byte.
+    The file is memory-mapped, so a lookup only pages in the records its probe sequence
+    visits, then reads the key and value it needs from path + '.heap', where keys
+    (UTF-8) and values (pickled) are appended and never overwritten.
+    Neither file has to fit in memory, and the OS page cache shares them between
+    every process that opens them.
+
+    Replacing a value appends the new one, removing a key leaves its bytes in the heap.
+    Resizes fill a new slot file and rename it over the old one once it is complete and
+    on disk, moving records by their stored hashes and offsets without reading the heap
+    (double hashing reads keys).
+    Resizes are never incremental.
+
+    The hash function must hash the same way in every process: not the built-in hash
+    (unless PYTHONHASHSEED is fixed), since open() checks it like HashMap.load() does.
+    Reads and writes of the heap use os.pread/os.pwrite, which Windows doesn't have.
+    """
+
+    def __init__(self, path: str, capacity: int, function, **options) -> None:
+        """
+        Creates a new, empty DiskHashMap in path and path + '.heap', replacing any files there.
+        Takes the options of hash_map_oa.HashMap, except incremental.
+        """
+        if options.get('incremental'):
+            raise ValueError("a DiskHashMap resizes all at once, it can't be incremental")
+
+        self._path = path
+        self._readonly = False
+        self._slots = None
+        self._opened = None
+        self._settings = b''
+
+        # an old slot file at path points into the heap until the new one is installed,
+        # so the heap is opened as it is and only emptied after that
+        self._heap = open(os.open(path + '.heap', os.O_RDWR | os.O_CREAT, 0o666), 'r+b')
+        self._heap_end = 0
+
+        super().__init__(capacity, function, **options)
+        self._heap.truncate(0)
+
+        # the header records how to read the table back, see open()
+        self._settings = self._pack_settings()
+        self._slots.write_settings(self._settings)
+
+    @classmethod
+    def open(cls, path: str, function=None, step_function=None, readonly: bool = False) -> "DiskHashMap":
+        """
+        Opens the DiskHashMap stored in path and path + '.heap'. The hash functions are
+        imported by name unless given, and have to hash the way they did when the map
+        was created, or a ValueError is raised. A readonly map maps the files read-only;
+        any number of processes can read one map while a single process writes it.
+        Writes show up in the readers as they happen, except that a reader keeps the
+        slot file it opened when the writer resizes: it has to open the map again.
+        """
+        slots = _SlotFile.map(path, readonly)
+        settings = pickle.loads(slots.settings())
+
+        map = cls.__new__(cls)
+        map._path = path
+        map._readonly = readonly
+        map._slots = None
+        map._opened = slots
+        map._settings = slots.settings()
+
+        map._heap = open(path + '.heap', 'rb' if readonly else 'r+b')
+        map._heap_end = os.fstat(map._heap.fileno()).st_size
+
+        map._adopt_settings(settings, function, step_function)
+        return map
+
+    def _pack_settings(self) -> bytes:
+        """
+        Returns the pickled settings the header keeps to read the table back with.
+        """
+        return pickle.dumps({
+            'function': function_identity(self._hash_function),
+            'step_function': function_identity(self._step_function),
+            'options': {
+                'tombstone_threshold': self._tombstone_threshold,
+                'probing': self._probing,
+                'power_of_two': self._power_of_two,
+            },
+            'policy': vars(self._policy),
+        }, pickle.HIGHEST_PROTOCOL)
+
+    def _adopt_settings(self, settings: dict, function, step_function) -> None:
+        """
+        Initializes a map whose slots were opened (self._opened) from their unpickled settings.
+        """
+        # _reset_buckets() adopts the opened slots instead of creating new ones
+        HashMap.__init__(self, self._opened.capacity, snapshot_function(settings['function'], function),
+                         step_function=snapshot_function(settings['step_function'], step_function),
+                         policy=ResizePolicy(**settings['policy']), **settings['options'])
+
+    def __enter__(self) -> "DiskHashMap":
+        """
+        Returns the map, for use in a with statement.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Closes the map at the end of a with statement.
+        """
+        self.close()
+
+    def flush(self) -> None:
+        """
+        Writes everything put in the map so far through to the disk:
+        the heap first, so no record on disk ever points past the end of it.
+        """
+        self._check_writable()
+        os.fsync(self._heap.fileno())
+        self._slots.flush()
+
+    def close(self) -> None:
+        """
+        Flushes the map (unless it is read-only) and closes its files.
+        """
+        if self._slots is None:
+            return
+        if not self._readonly:
+            self.flush()
+        self._slots.close()
+        self._slots = None
+        self._control = None
+        self._heap.close()
+
+    def save(self, path: str) -> None:
+        """
+        Not supported: a DiskHashMap is its files, see flush() and open().
+        """
+        raise io.UnsupportedOperation("a DiskHashMap is already on disk, use flush() and open()")
+
+    @classmethod
+    def load(cls, path: str, function=None, step_function=None) -> "HashMap":
+        """
+        Not supported: there is nothing save() wrote, see open().
+        """
+        raise io.UnsupportedOperation(f"a {cls.__name__} isn't loaded from a snapshot, open() it")
+
+    def snapshot(self) -> "HashMap":
+        """
+        Not supported: the buckets live in files that are written in place.
+        """
+        raise io.UnsupportedOperation(f"a {type(self).__name__} can't take snapshots")
+
+    def _check_writable(self) -> None:
+        """
+        Raises io.UnsupportedOperation if the map was opened read-only.
+        """
+        if self._readonly:
+            raise io.UnsupportedOperation(f"the {type(self).__name__} was opened read-only")
+
+    # ------------- the size and tombstone count live in the slot file header ------------- #
+
+    @property
+    def _size(self) -> int:
+        return self._slots.counters[1]
+
+    @_size.setter
+    def _size(self, size: int) -> None:
+        self._check_writable()
+        self._slots.counters[1] = size
+
+    @property
+    def _tombstones(self) -> int:
+        return self._slots.counters[2]
+
+    @_tombstones.setter
+    def _tombstones(self, tombstones: int) -> None:
+        self._check_writable()
+        self._slots.counters[2] = tombstones
+
+    # ------------- heap file ------------- #
+
+    def _append(self, data: bytes) -> int:
+        """
+        Appends data to the heap and returns its offset.
+        """
+        self._check_writable()
+        offset = self._heap_end
+        os.pwrite(self._heap.fileno(), len(data).to_bytes(8, 'little') + data, offset)
+        self._heap_end += 8 + len(data)
+        return offset
+
+    def _read(self, offset: int) -> bytes:
+        """
+        Returns the data appended to the heap at offset.
+        """
+        fd = self._heap.fileno()
+        data = os.pread(fd, _HEAP_READ, offset)
+        length = int.from_bytes(data[:8], 'little')
+        if 8 + length > len(data):
+            data = os.pread(fd, 8 + length, offset)
+        return data[8:8 + length]
+
+    # ------------- bucket storage ------------- #
+
+    def _reset_buckets(self, capacity: int) -> None:
+        """
+        Replaces the slot file with one of capacity empty buckets. The old file stays mapped
+        for whoever still holds its _SlotFile.
+        When the map is being opened, the slot file it opened is used as it is.
+        """
+        if self._opened is not None:
+            slots, self._opened = self._opened, None
+        else:
+            self._check_writable()
+            slots = self._new_slots(capacity)
+            self._install_slots(slots)
+
+        self._use_slots(slots)
+
+    def _use_slots(self, slots: _SlotFile) -> None:
+        """
+        Makes slots the table the map reads and writes.
+        """
+        self._slots = slots
+        self._capacity = slots.capacity
+        self._control = slots.control
+
+    def _new_slots(self, capacity: int) -> _SlotFile:
+        """
+        Returns a new slot file of capacity empty buckets, under a temporary name:
+        the map's files don't change until it is installed.
+        """
+        return _SlotFile.create(self._path, capacity, self._settings)
+
+    def _install_slots(self, slots: _SlotFile) -> None:
+        """
+        Makes a new slot file the map's file. The heap its records point into goes to disk first.
+        """
+        os.fsync(self._heap.fileno())
+        slots.install(self._path)
+
+    def _discard_slots(self, slots: _SlotFile) -> None:
+        """
+        Throws away a new slot file that was never installed.
+        """
+        name = slots.name
+        slots.close()
+        os.remove(name)
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the hash the table uses for key, truncated to the 64 bits of a record.
+        """
+        return super()._hash(key) & 0xFFFFFFFFFFFFFFFF
+
+    def _hash_many(self, keys: list) -> list:
+        """
+        Returns the hashes the table uses for a batch of keys, truncated to 64 bits.
+        """
+        return [hash & 0xFFFFFFFFFFFFFFFF for hash in super()._hash_many(keys)]
+
+    def _entry_at(self, index: int) -> HashEntry:
+        """
+        Builds an entry for the bucket at index, or returns None for an empty bucket.
+        """
+        if self._control[index] == EMPTY:
+            return None
+
+        entry = HashEntry(self._key_at(index), self._value_at(index), self._hash_at(index))
+        entry.is_tombstone = self._control[index] == DELETED
+        return entry
+
+    def _key_at(self, index: int) -> str:
+        """
+        Returns the key in the full bucket at index.
+        """
+        return str(self._read(self._slots.key_offsets[index]), 'utf-8')
+
+    def _value_at(self, index: int) -> object:
+        """
+        Returns the value in the full bucket at index.
+        """
+        return pickle.loads(self._read(self._slots.value_offsets[index]))
+
+    def _hash_at(self, index: int) -> int:
+        """
+        Returns the stored hash of the key in the full bucket at index.
+        """
+        return self._slots.hashes[index]
+
+    def _matches(self, index: int, key: str, hash: int) -> bool:
+        """
+        Returns True if the full bucket at index holds key. The key is only
+        read from the heap when the stored hash matches.
+        """
+        return self._slots.hashes[index] == hash and self._key_at(index) == key
+
+    def _set_value_at(self, index: int, value: object) -> None:
+        """
+        Appends a new value for the full bucket at index and points the bucket at it.
+        """
+        self._slots.value_offsets[index] = self._append(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _store_at(self, index: int, key: str, value: object, hash: int) -> None:
+        """
+        Appends a new key/value pair to the heap and points the bucket at index at it.
+        """
+        key_offset = self._append(key.encode())
+        value_offset = self._append(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        slots = self._slots
+        slots.hashes[index] = hash
+        slots.key_offsets[index] = key_offset
+        slots.value_offsets[index] = value_offset
+
+    def _delete_at(self, index: int) -> None:
+        """
+        Nothing to release: the caller marks the bucket DELETED and the heap is append-only.
+        """
+        self._check_writable()
+
+    def _discard_at(self, index: int) -> None:
+        """
+        Nothing to release, the heap is append-only.
+        """
+
+    # ------------------------------------------------------------------------- #
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the table by writing a new slot file.
+        Records move over with their stored hashes and heap offsets,
+        the keys and values themselves are not read (unless double hashing
+        needs a key for its step) or written again.
+        """
+        self._check_writable()
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._round_capacity(new_capacity)
+
+        # keep growing, as put() would, until the existing entries fit under the max load
+        while self._size / new_capacity > self._policy.max_load:
+            new_capacity = self._round_capacity(self._policy.grown_capacity(new_capacity))
+
+        # the new table is filled in completely before it replaces the old one,
+        # which stays in place if anything goes wrong on the way
+        old = self._slots
+        slots = self._new_slots(new_capacity)
+        self._use_slots(slots)
+        try:
+            size = 0
+            for index in range(old.capacity):
+                if old.control[index] < EMPTY:
+                    hash, key_offset = old.hashes[index], old.key_offsets[index]
+
+                    # no two keys in the table are equal, so only the probe step can need the key
+                    key = str(self._read(key_offset), 'utf-8') if self._probing == 'double' else None
+                    new_index = self._find_slot(key, hash)[0]
+
+                    slots.hashes[new_index] = hash
+                    slots.key_offsets[new_index] = key_offset
+                    slots.value_offsets[new_index] = old.value_offsets[index]
+                    slots.control[new_index] = self._fingerprint(hash)
+                    size += 1
+
+            self._size = size
+            self._install_slots(slots)
+        except BaseException:
+            self._use_slots(old)
+            self._discard_slots(slots)
+            raise
+
+        self._version += 1
+        old.close()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map and empties its heap file.
+        """
+        self._check_writable()
+        old = self._slots
+        super().clear()
+        old.close()
+
+        self._heap.truncate(0)
+        self._heap_end = 0
+
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    from a6_include import hash_function_2
+
+    print("\nDiskHashMap example 1")
+    print("---------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.slots')
+        with DiskHashMap(path, 11, hash_function_2) as m:
+            for i in range(1, 101):
+                m.put('key' + str(i), [i, i * i])
+            m.put('key1', 'replaced')
+            m.remove('key2')
+            print(m.get_size(), m.get_capacity(), m.get('key1'), m.get('key10'), m.contains_key('key2'))
+
+        with DiskHashMap.open(path, readonly=True) as m:
+            print(m.get_size(), m.get_capacity(), m.get('key1'), m.get('key100'), m.contains_key('key2'))
+            try:
+                m.put('key2', 2)
+            except io.UnsupportedOperation as error:
+                print('UnsupportedOperation:', error)
+
+        try:
+            DiskHashMap.load(path)
+        except io.UnsupportedOperation as error:
+            print('UnsupportedOperation:', error)
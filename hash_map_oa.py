@@ -5,70 +5,224 @@
 # Due Date: 12/2/2022
 # Description: Implementation of a HashMap  using  Open Addressing with Quadratic Probing.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+import copy
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, ItemsView, KeysView, ResizePolicy, ValuesView,
+                        function_identity, hash_function_1, hash_function_2, hash_many, mix_hash,
+                        next_prime, read_snapshot, snapshot_function, write_snapshot)
+
+PROBING_STRATEGIES = ('linear', 'quadratic', 'double')
+
+# control byte values: a full bucket stores the 7-bit fingerprint of its key's hash
+EMPTY = 0x80
+DELETED = 0xFE
+
+# grow at load 0.5, never shrink
+DEFAULT_POLICY = ResizePolicy(0.5)
+
+# copy-on-write states of a map's buckets, see HashMap.snapshot()
+_SHARED = object()          # a snapshot shares all of them
+_FROZEN = object()          # the map is a snapshot
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, tombstone_threshold: float = 0.25,
+                 probing: str = 'quadratic', step_function=None,
+                 incremental: bool = False, rehash_step: int = 64,
+                 policy: ResizePolicy = None, power_of_two: bool = False) -> None:
         """
-        Initialize new HashMap that uses
-        quadratic probing for collision resolution
+        Initialize new HashMap that uses open addressing for collision resolution.
+        probing picks the probe sequence: 'linear', 'quadratic' or 'double' hashing.
+        Double hashing takes its step from step_function, which defaults to
+        whichever of hash_function_1 / hash_function_2 is not the primary function.
+        When tombstones take up more than tombstone_threshold of the capacity
+        the table is rehashed in place to reclaim them.
+        With incremental set, growing (or compacting) the table doesn't rehash everything
+        in one call: the old buckets are kept next to the new ones and every following
+        operation moves rehash_step of them over, while lookups check both tables.
+        policy (a ResizePolicy) sets when the table grows and shrinks and by how much,
+        by default it doubles at load 0.5 and never shrinks.
+        With power_of_two set the capacity is a power of two instead of a prime:
+        hashes go through mix_hash and the bucket index is hash & (capacity - 1),
+        and quadratic probing steps by triangular numbers, which visit every bucket.
         """
-        self._buckets = DynamicArray()
+        if probing not in PROBING_STRATEGIES:
+            raise ValueError(f"probing must be one of {PROBING_STRATEGIES}, not {probing!r}")
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if policy is None:
+            policy = DEFAULT_POLICY
+
+        # quadratic probing only reaches half of a prime table's buckets,
+        # and every probe sequence needs an empty bucket to end on
+        if policy.max_load >= 1 or (probing == 'quadratic' and not power_of_two and policy.max_load > 0.5):
+            raise ValueError(f"max_load {policy.max_load} is too high for {probing} probing")
+
+        if step_function is None:
+            step_function = hash_function_1 if function is hash_function_2 else hash_function_2
+
+        # capacity must be a prime number (or a power of two)
+        self._power_of_two = power_of_two
+        self._reset_buckets(self._round_capacity(capacity))
 
         self._hash_function = function
-        self._size = 0
+        self._probing = probing
+        self._step_function = step_function
+        self._tombstone_threshold = tombstone_threshold
+        self._policy = policy
+
+        self._incremental = incremental
+        self._rehash_step = rehash_step
+        self._old = None            # map holding the old buckets during an incremental resize
+        self._rehash_index = 0      # next old bucket to move
+
+        # bumped whenever keys come or go or move, so running iterations can tell
+        self._version = 0
+
+        # None while no snapshot shares the buckets, see snapshot()
+        self._owned = None
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
         """
+        self._finish_rehash()
+
         out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._entry_at(i)) + '\n'
         return out
 
-    def _next_prime(self, capacity: int) -> int:
+    # ------------- bucket storage (overridden by CompactHashMap) ------------- #
+
+    def _reset_buckets(self, capacity: int) -> None:
         """
-        Increment from given number to find the closest prime number
+        Replaces the table with capacity empty buckets.
         """
-        if capacity % 2 == 0:
-            capacity += 1
+        self._capacity = capacity
+        self._buckets = DynamicArray([None] * capacity, copy=False)
 
-        while not self._is_prime(capacity):
-            capacity += 2
+        # one control byte per bucket, so probes rarely need to touch the entries
+        self._control = bytearray([EMPTY]) * capacity
 
-        return capacity
+        self._size = 0
+        self._tombstones = 0
 
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def _hash(self, key: str) -> int:
         """
-        Determine if given integer is a prime number and return boolean
+        Returns the hash the table uses for key.
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        if self._power_of_two:
+            return mix_hash(self._hash_function(key))
+        return self._hash_function(key)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    def _hash_many(self, keys: list) -> list:
+        """
+        Returns the hashes the table uses for a batch of keys.
+        """
+        if self._power_of_two:
+            return [mix_hash(hash) for hash in hash_many(self._hash_function, keys)]
+        return hash_many(self._hash_function, keys)
+
+    def _entry_at(self, index: int) -> HashEntry:
+        """
+        Returns the entry in the bucket at index, or None for an empty bucket.
+        """
+        return self._buckets.get_at_index(index)
+
+    def _key_at(self, index: int) -> str:
+        """
+        Returns the key in the full bucket at index.
+        """
+        return self._buckets.get_at_index(index).key
+
+    def _value_at(self, index: int) -> object:
+        """
+        Returns the value in the full bucket at index.
+        """
+        return self._buckets.get_at_index(index).value
+
+    def _hash_at(self, index: int) -> int:
+        """
+        Returns the cached hash of the key in the full bucket at index.
+        """
+        return self._buckets.get_at_index(index).hash
+
+    def _matches(self, index: int, key: str, hash: int) -> bool:
+        """
+        Returns True if the full bucket at index holds key. The cached hash
+        is compared first so most mismatches never compare the keys themselves.
+        """
+        pair = self._buckets.get_at_index(index)
+        return pair.hash == hash and pair.key == key
+
+    def _set_value_at(self, index: int, value: object) -> None:
+        """
+        Replaces the value in the full bucket at index.
+        """
+        self._buckets.get_at_index(index).value = value
+
+    def _store_at(self, index: int, key: str, value: object, hash: int) -> None:
+        """
+        Puts a new key/value pair in the bucket at index.
+        """
+        self._buckets.set_at_index(index, HashEntry(key, value, hash))
+
+    def _delete_at(self, index: int) -> None:
+        """
+        Turns the entry in the bucket at index into a tombstone.
+        """
+        self._buckets.get_at_index(index).is_tombstone = True
+
+    def _discard_at(self, index: int) -> None:
+        """
+        Lets go of the entry in the bucket at index. The caller marks the bucket
+        DELETED in the control bytes, so probing treats it as a tombstone.
+        """
+        self._buckets.set_at_index(index, None)
+
+    def _copy_buckets(self) -> None:
+        """
+        Replaces the bucket arrays with copies, still holding the same entries.
+        """
+        self._buckets = DynamicArray(self._buckets)
+        self._control = bytearray(self._control)
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _copy_bucket(self, index: int) -> None:
+        """
+        Replaces the entry in the bucket at index with a copy, so it can be changed.
+        """
+        entry = self._buckets.get_at_index(index)
+        if entry is not None:
+            duplicate = HashEntry(entry.key, entry.value, entry.hash)
+            duplicate.is_tombstone = entry.is_tombstone
+            self._buckets.set_at_index(index, duplicate)
 
-        return True
+    # ------------------------------------------------------------------------- #
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity the table uses when asked for capacity buckets:
+        the next power of two in power-of-two mode, the next prime otherwise.
+        """
+        if self._power_of_two:
+            return 1 << max(capacity - 1, 0).bit_length()
+        return next_prime(capacity)
+
+    def _home(self, hash: int) -> int:
+        """
+        Returns the index of the bucket a hash maps to, where its probe sequence starts.
+        """
+        if self._power_of_two:
+            return hash & (self._capacity - 1)
+        return hash % self._capacity
 
     def get_size(self) -> int:
         """
         Return size of map
         """
+        if self._old is not None:
+            return self._size + self._old._size
         return self._size
 
     def get_capacity(self) -> int:
@@ -77,6 +231,14 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstones(self) -> int:
+        """
+        Return number of tombstones in map.
+        During an incremental resize only those of the new table count,
+        the old table's go away with it.
+        """
+        return self._tombstones
+
     def put(self, key: str, value: object) -> None:
         """
         Updates the key/value pair in the hash map.
@@ -84,75 +246,401 @@ class HashMap:
         its associated value must be replaced with the new value.
         If the given key is not in the hash map, a new key/value pair must be added.
         """
-        # resize to double its current capacity when current load factor
-        # of the table is greater than or equal to 0.5.
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        if self._old is not None:
+            self._migrate(self._rehash_step)
 
-        # compute an initial index i-initial
-        hash = self._hash_function(key)
-        index_initial = hash % self._capacity
+        # grow by the policy's growth factor when current load factor
+        # of the table is greater than or equal to its max load.
+        # Mid resize the entries still in the old buckets count too, they all end up in these.
+        if self.get_size() / self._capacity >= self._policy.max_load:
+            self._rehash(self._policy.grown_capacity(self._capacity))
+
+        # a single walk of the probe sequence finds either the key or the slot to use
+        hash = self._hash(key)
+        table, index = self._find(key, hash)
 
         # If the given key already exists in the hash map, its associated value must be replaced with the new value.
-        if self.contains_key(key):
-            pair = self._buckets.get_at_index(index_initial)
-            if pair.key == key:
-                pair.value = value
+        if table is not None:
+            if table._owned is not None:
+                table._own(index)
+            table._set_value_at(index, value)
+            return
+
+        # no bucket on the probe sequence is free (quadratic probing only reaches
+        # half of a prime table): grow until there is one
+        while index is None:
+            self.resize_table(self._policy.grown_capacity(self._capacity))
+            index = self._find_slot(key, hash)[0]
+
+        # otherwise fill the first tombstone / empty bucket seen along the way
+        self._insert_at(index, key, value, hash)
+
+    def put_many(self, items) -> None:
+        """
+        Puts every (key, value) pair of an iterable in the hash map.
+        The table is resized at most once, up front, to fit all of the new pairs
+        under the policy's max load, so the load isn't checked again for each pair.
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+
+        self._finish_rehash()
+        if (self._size + len(items)) / self._capacity > self._policy.max_load:
+            self.resize_table(self._policy.capacity_for(self._size + len(items)))
+
+        for key, value in items:
+            hash = self._hash(key)
+            index, found = self._find_slot(key, hash)
+            if found:
+                if self._owned is not None:
+                    self._own(index)
+                self._set_value_at(index, value)
             else:
-                for j in range(1, self._capacity):
-                    index = (index_initial + j ** 2) % self._capacity
-                    pair = self._buckets.get_at_index(index)
-                    if pair and pair.key == key:
-                        pair.value = value
-                        return
+                self._insert_at(index, key, value, hash)
+
+    @classmethod
+    def from_items(cls, items, function, expected_size: int = None, **options) -> "HashMap":
+        """
+        Builds a hash map from an iterable of (key, value) pairs in a single pass.
+        The table is sized once for expected_size keys, by default the number of pairs.
+        Any other options are passed on to the constructor.
+        """
+        if not hasattr(items, '__len__'):
+            items = list(items)
+        if expected_size is None:
+            expected_size = len(items)
+
+        policy = options.get('policy') or DEFAULT_POLICY
+        map = cls(policy.capacity_for(expected_size), function, **options)
+        map.put_many(items)
+        return map
+
+    def save(self, path: str) -> None:
+        """
+        Writes a snapshot of the hash map to a file (see write_snapshot in a6_include):
+        its settings, which hash functions it uses, and its buckets exactly as laid out,
+        control bytes, tombstones and cached hashes included.
+        """
+        self._finish_rehash()
+        live = [index for index in range(self._capacity) if self._control[index] < EMPTY]
+
+        header = {
+            'map': ('open addressing', type(self).__name__),
+            'capacity': self._capacity,
+            'size': self._size,
+            'tombstones': self._tombstones,
+            'function': function_identity(self._hash_function),
+            'step_function': function_identity(self._step_function),
+            'options': {
+                'tombstone_threshold': self._tombstone_threshold,
+                'probing': self._probing,
+                'incremental': self._incremental,
+                'rehash_step': self._rehash_step,
+                'power_of_two': self._power_of_two,
+            },
+            'policy': vars(self._policy),
+        }
+        write_snapshot(path, header, self._control,
+                       [self._hash_at(index) for index in live],
+                       [self._key_at(index) for index in live],
+                       [self._value_at(index) for index in live])
+
+    @classmethod
+    def load(cls, path: str, function=None, step_function=None) -> "HashMap":
+        """
+        Builds a hash map from a file written by save(). Every entry goes straight back
+        into the bucket it was saved from with its saved hash: nothing is rehashed.
+        The hash functions are imported by name unless given; either way they have to
+        hash the way they did when the map was saved, or a ValueError is raised.
+        """
+        header, control, hashes, keys, values = read_snapshot(path)
+        if header['map'] != ('open addressing', cls.__name__):
+            raise ValueError(f"{path} is not a snapshot of an open addressing {cls.__name__}")
+
+        map = cls(header['capacity'], snapshot_function(header['function'], function),
+                  step_function=snapshot_function(header['step_function'], step_function),
+                  policy=ResizePolicy(**header['policy']), **header['options'])
+
+        # the control bytes say which buckets are full, in order
+        live = [index for index in range(map._capacity) if control[index] < EMPTY]
+        for index, key, value, hash in zip(live, keys, values, hashes):
+            map._store_at(index, key, value, hash)
+
+        map._control = control
+        map._size = header['size']
+        map._tombstones = header['tombstones']
+        return map
+
+    def _insert_at(self, index: int, key: str, value: object, hash: int) -> None:
+        """
+        Adds a key that is not in the map yet to the empty or tombstone bucket at index.
+        """
+        if self._owned is not None:
+            self._own(index)
+        if self._control[index] == DELETED:
+            self._tombstones -= 1
+        self._version += 1
+        self._store_at(index, key, value, hash)
+        self._control[index] = self._fingerprint(hash)
+        self._size += 1
+
+    def probing_seq(self, initial: int, step: int = 1):
+        """
+        Yields the indices of the probe sequence starting at initial.
+        step is the fixed stride of linear probing (1) and double hashing.
+        """
+        index = initial
+
+        if self._power_of_two:
+            # a power of two capacity - 1 masks like % capacity
+            mask = self._capacity - 1
+
+            # triangular numbers (step j + 1) visit every bucket of a power-of-two table
+            if self._probing == 'quadratic':
+                for j in range(self._capacity):
+                    yield index
+                    index = (index + j + 1) & mask
+                return
+
+            for _ in range(self._capacity):
+                yield index
+                index = (index + step) & mask
             return
 
+        if self._probing == 'quadratic':
+            # (j + 1) ** 2 - j ** 2 == 2j + 1, so each step only needs an addition
+            for j in range(self._capacity):
+                yield index
+                index = (index + 2 * j + 1) % self._capacity
+            return
+
+        for _ in range(self._capacity):
+            yield index
+            index = (index + step) % self._capacity
+
+    def _probe_step(self, key: str) -> int:
+        """
+        Returns the stride of the probe sequence for key.
+        """
+        if self._probing == 'double':
+            # an odd step is coprime with a power of two capacity
+            if self._power_of_two:
+                return (self._step_function(key) & (self._capacity - 1)) | 1
+
+            # never 0, and always coprime with the prime capacity so every bucket is reachable
+            return 1 + self._step_function(key) % (self._capacity - 1)
+        return 1
+
+    def _fingerprint(self, hash: int) -> int:
+        """
+        Returns the 7-bit fingerprint of a hash that full buckets keep in their control byte.
+        """
+        # mixed hashes: the low bits are the bucket index, the top 7 bits are independent of it
+        if self._power_of_two:
+            return hash >> 57
+
+        # fold the higher bits in, the low bits alone mostly repeat the bucket index
+        return (hash ^ (hash >> 7) ^ (hash >> 14)) & 0x7F
+
+    def _find_slot(self, key: str, hash: int) -> (int, bool):
+        """
+        Follows the probe sequence of key (whose hash is given) until it finds the key or an empty bucket.
+        Returns (index, True) when the key is stored at index. Otherwise returns
+        (index, False) where index is the first reusable bucket for the key:
+        the first tombstone seen, or the empty bucket that ended the search.
+        """
+        first_tombstone = None
+        control = self._control
+
+        fingerprint = self._fingerprint(hash)
+        for index in self.probing_seq(self._home(hash), self._probe_step(key)):
+            state = control[index]
+
+            # an empty bucket ends the probe sequence, the key can't be further along
+            if state == EMPTY:
+                if first_tombstone is None:
+                    return index, False
+                return first_tombstone, False
+
+            # remember the first tombstone so it can be reused
+            if state == DELETED:
+                if first_tombstone is None:
+                    first_tombstone = index
+
+            # only a matching fingerprint is worth comparing the full key
+            elif state == fingerprint and self._matches(index, key, hash):
+                return index, True
+
+        return first_tombstone, False
 
-        # create the new entry to enter
-        new_entry = HashEntry(key, value)
+    def _find_many(self, keys: list, hashes: list) -> list:
+        """
+        Returns the index of each key (whose hash is given) in this table, or None for
+        the keys it doesn't hold: _find_slot() for a whole batch. The home buckets,
+        fingerprints and probe strides of all the keys are worked out up front, and
+        each probe sequence is walked in a plain loop rather than by probing_seq().
+        """
+        capacity, control, matches = self._capacity, self._control, self._matches
+
+        if self._power_of_two:
+            mask = capacity - 1
+            homes = [hash & mask for hash in hashes]
+            fingerprints = [hash >> 57 for hash in hashes]
+        else:
+            homes = [hash % capacity for hash in hashes]
+            fingerprints = [(hash ^ (hash >> 7) ^ (hash >> 14)) & 0x7F for hash in hashes]
+
+        # the j-th step of a probe sequence is step + growth * j, see probing_seq()
+        growth = 0
+        if self._probing == 'double':
+            steps = hash_many(self._step_function, keys)
+            if self._power_of_two:
+                steps = [(step & mask) | 1 for step in steps]
+            else:
+                steps = [1 + step % (capacity - 1) for step in steps]
+        else:
+            steps = [1] * len(keys)
+            if self._probing == 'quadratic':
+                growth = 1 if self._power_of_two else 2
+
+        indices = []
+        for key, hash, index, fingerprint, step in zip(keys, hashes, homes, fingerprints, steps):
+            found = None
+            for j in range(capacity):
+                state = control[index]
+                if state == EMPTY:
+                    break
+                if state == fingerprint and matches(index, key, hash):
+                    found = index
+                    break
+                index = (index + step + growth * j) % capacity
+            indices.append(found)
+
+        return indices
+
+    def _find(self, key: str, hash: int) -> ("HashMap", int):
+        """
+        Returns the table holding key and the key's index in it: the map itself or,
+        during an incremental resize, the old table. If the key is not in the map,
+        returns None and the index of the bucket the map would put the key in.
+        """
+        index, found = self._find_slot(key, hash)
+        if found:
+            return self, index
+
+        if self._old is not None:
+            old_index, found = self._old._find_slot(key, hash)
+            if found:
+                return self._old, old_index
 
-        # If array at index initial is empty, insert the element there and stop.
-        if self._buckets[index_initial] is None:
-            self._buckets.set_at_index(index_initial, new_entry)
-            self._size += 1
+        return None, index
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Rehashes the table into new_capacity buckets: all at once,
+        or by starting an incremental resize when the map is incremental.
+        """
+        if not self._incremental:
+            self.resize_table(new_capacity)
             return
 
-        # compute the next index i in the probing sequence until find empty bucket and add
-        index = self.probing_seq(index_initial)
-        self._buckets.set_at_index(index, new_entry)
-        self._size += 1
+        self._check_writable()
+        self._finish_rehash()
+        self._version += 1
+
+        # a shallow copy keeps hold of the old buckets (and shares them with any snapshot)
+        self._old = copy.copy(self)
+
+        # every old entry has to fit in the new buckets under the max load
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size / new_capacity > self._policy.max_load:
+            new_capacity = self._round_capacity(self._policy.grown_capacity(new_capacity))
+        self._reset_buckets(new_capacity)
+        self._owned = None
+        self._rehash_index = 0
 
-    def probing_seq(self, initial) -> int:
+    def _migrate(self, count: int) -> None:
         """
-        Returns the next empty index.
+        Moves the entries of the next count old buckets into the new buckets,
+        using their cached hashes. Ends the incremental resize once all are moved.
         """
-        # have it start at 0 to catch tombstones
-        for j in range(0, self._capacity):
-            index = (initial + j ** 2) % self._capacity
-            pair = self._buckets.get_at_index(index)
-            if pair is None:
-                return index
-            if pair.is_tombstone is True:
-                return index
+        old = self._old
+        stop = min(self._rehash_index + count, old._capacity)
+
+        for index in range(self._rehash_index, stop):
+            if old._control[index] < EMPTY:
+                key, hash = old._key_at(index), old._hash_at(index)
+                self._insert_at(self._find_slot(key, hash)[0], key, old._value_at(index), hash)
+
+                # the moved bucket becomes a tombstone, old probe sequences still pass through it;
+                # its entry is released now rather than all at once when the old table goes
+                if old._owned is not None:
+                    old._own(index)
+                old._discard_at(index)
+                old._control[index] = DELETED
+                old._size -= 1
+
+        self._rehash_index = stop
+        if stop == old._capacity:
+            self._old = None
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes an incremental resize in progress, if any.
+        """
+        if self._old is not None:
+            self._migrate(self._old._capacity)
 
+    def probe_stats(self) -> (float, int):
+        """
+        Returns the average and maximum probe length of the entries in the map,
+        counted as the number of buckets a successful get() inspects.
+        """
+        self._finish_rehash()
+        total, longest = 0, 0
+
+        for index in range(self._capacity):
+            if self._control[index] >= EMPTY:
+                continue
+
+            # walk the entry's probe sequence until it reaches the entry
+            initial = self._home(self._hash_at(index))
+            length = 0
+            for probe in self.probing_seq(initial, self._probe_step(self._key_at(index))):
+                length += 1
+                if probe == index:
+                    break
+
+            total += length
+            longest = max(longest, length)
+
+        if self._size == 0:
+            return 0.0, 0
+        return total / self._size, longest
 
     def table_load(self) -> float:
         """
         Returns the current hash table load factor.
+        Only live entries count, see tombstone_load() for the dead ones.
+        During an incremental resize the entries still in the old table count too,
+        as the load they put on the new one.
         """
-        return float(self._size / self._capacity)
+        return float(self.get_size() / self._capacity)
+
+    def tombstone_load(self) -> float:
+        """
+        Returns the fraction of the hash table taken up by tombstones.
+        """
+        return float(self._tombstones / self._capacity)
 
     def empty_buckets(self) -> int:
         """
         Returns the number of empty buckets in the hash table.
+        Buckets holding a tombstone are not empty, they still extend probe sequences.
+        During an incremental resize every entry still in the old table counts as
+        taking a bucket of the new one, as it will once it's moved.
         """
-        counter = 0  # counts empty buckets
-
-        for i in range(self._buckets.length()):
-            if self._buckets.get_at_index(i) is None:
-                counter += 1
-
-        return counter
+        return self._capacity - self.get_size() - self._tombstones
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -161,28 +649,31 @@ class HashMap:
         and all hash table links must be rehashed.
 
         """
+        # an explicit resize is done in one go
+        self._check_writable()
+        self._finish_rehash()
+
         if new_capacity < self._size:
             return
 
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        new_capacity = self._round_capacity(new_capacity)
 
-        # hold the old values
-        holder = self._buckets
+        # keep growing, as put() would, until the existing entries fit under the max load
+        while self._size / new_capacity > self._policy.max_load:
+            new_capacity = self._round_capacity(self._policy.grown_capacity(new_capacity))
 
-        # reset the array
-        self._buckets = DynamicArray()
-        self._capacity = new_capacity
-        self._size = 0
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # a shallow copy keeps hold of the old buckets while the new ones are filled
+        holder = copy.copy(self)
+        self._reset_buckets(new_capacity)
+        self._owned = None
+        self._version += 1
 
-        # iterate through array
-        for index in range(holder.length()):
-            if holder[index] is not None:
-                key = holder[index].key
-                value = holder[index].value
-                self.put(key, value)
+        # iterate through the old buckets, tombstones are dropped rather than carried forward
+        for index in range(holder._capacity):
+            if holder._control[index] < EMPTY:
+                # the cached hash is reused, keys are never run through the hash function again
+                key, hash = holder._key_at(index), holder._hash_at(index)
+                self._insert_at(self._find_slot(key, hash)[0], key, holder._value_at(index), hash)
 
     def get(self, key: str) -> object:
         """
@@ -190,21 +681,12 @@ class HashMap:
         If the key is not in the hash map, the method returns None.
 
         """
-        # compute an initial index i-initial
-        hash = self._hash_function(key)
-        index_initial = hash % self._capacity
+        if self._old is not None:
+            self._migrate(self._rehash_step)
 
-        # check initial index
-        pair = self._buckets.get_at_index(index_initial)
-        if pair and pair.is_tombstone is False and pair.key == key:
-            return pair.value
-
-        # use the probe seq to find next index
-        for j in range(1, self._capacity):
-            index = (index_initial + j ** 2) % self._capacity
-            pair = self._buckets.get_at_index(index)
-            if pair and pair.is_tombstone is False and pair.key == key:
-                return pair.value
+        table, index = self._find(key, self._hash(key))
+        if table is not None:
+            return table._value_at(index)
 
         return None
 
@@ -214,89 +696,324 @@ class HashMap:
         Otherwise it returns False.
         An empty hash map does not contain any keys.
         """
-        if self._size == 0:
+        if self.get_size() == 0:
             return False
 
-        # run through array
-        for index in range(self._capacity):
-            if self._buckets[index] is not None:
-                pair = self._buckets.get_at_index(index)
-                if pair.is_tombstone is False and pair.key == key:
-                    return True
+        if self._old is not None:
+            self._migrate(self._rehash_step)
+
+        return self._find(key, self._hash(key))[0] is not None
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of each of the given keys, in order,
+        and None for the keys that are not in the hash map.
+        The whole batch is hashed at once (see hash_many in a6_include) and then
+        looked up at once (see _find_many()).
+        """
+        keys = list(keys)
+        hashes = self._hash_many(keys)
+        value_at, old = self._value_at, self._old
+
+        values = []
+        for key, hash, index in zip(keys, hashes, self._find_many(keys, hashes)):
+            if index is not None:
+                values.append(value_at(index))
+            elif old is not None:
+                # mid resize, a key missing from the new buckets may not have moved yet
+                index, found = old._find_slot(key, hash)
+                values.append(old._value_at(index) if found else None)
+            else:
+                values.append(None)
 
-        return False
+        return values
+
+    def contains_many(self, keys) -> list:
+        """
+        Returns a list telling, for each of the given keys in order, whether it is in the hash map.
+        """
+        keys = list(keys)
+        if self.get_size() == 0:
+            return [False] * len(keys)
+
+        hashes = self._hash_many(keys)
+        indices = self._find_many(keys, hashes)
+
+        old = self._old
+        if old is not None:
+            return [index is not None or old._find_slot(key, hash)[1]
+                    for key, hash, index in zip(keys, hashes, indices)]
+        return [index is not None for index in indices]
 
     def remove(self, key: str) -> None:
         """
         Removes the given key and its associated value from the hash map.
         If the key is not in the hash map, the method does nothing (no exception needs to be raised).
         """
-        # if key is not in the hash map
-        if not self.contains_key(key):
-            return
+        if self._old is not None:
+            self._migrate(self._rehash_step)
 
-        # run through array
-        for index in range(self._capacity):
-            if self._buckets[index] is not None:
-                pair = self._buckets.get_at_index(index)
-                if pair.key == key:
-                    pair.is_tombstone = True
-                    self._size -= 1
+        table, index = self._find(key, self._hash(key))
 
+        if table is None:
+            return
+
+        # leave a tombstone so probe sequences passing through this bucket keep going
+        if table._owned is not None:
+            table._own(index)
+        table._delete_at(index)
+        table._control[index] = DELETED
+        table._size -= 1
+        table._tombstones += 1
+        self._version += 1
+
+        # shrink once the load falls under the policy's min load, which reclaims tombstones too
+        size = self.get_size()
+        if self._policy.should_shrink(size, self._capacity):
+            new_capacity = self._round_capacity(self._policy.shrunk_capacity(size))
+            if new_capacity < self._capacity:
+                self._rehash(new_capacity)
+                return
+
+        # once tombstones pile up, rehash in place (same capacity) to reclaim them
+        if self._tombstones > self._tombstone_threshold * self._capacity:
+            self._rehash(self._capacity)
 
     def clear(self) -> None:
         """
         Clears the contents of the hash map.
-        It does not change the underlying hash table capacity.
+        It does not change the underlying hash table capacity,
+        unless the policy shrinks tables (min load above 0): then it drops to the min capacity.
         """
-        self._buckets = DynamicArray()
+        self._check_writable()
+        capacity = self._capacity
+        if self._policy.min_load > 0:
+            capacity = self._round_capacity(self._policy.min_capacity)
 
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._reset_buckets(capacity)
+        self._owned = None
+        self._old = None
+        self._version += 1
 
-        self._size = 0
+    def snapshot(self) -> "HashMap":
+        """
+        Returns a read-only copy of the hash map as it is now, in O(1).
+        The snapshot shares the map's buckets, and the map copies them before writing
+        to them again: its bucket arrays on the first write (one flat, C speed copy of
+        capacity references and control bytes), then each entry before it's changed.
+        Later changes to the map don't show up in the snapshot, so it can be read and
+        iterated (by another thread too) while the map carries on.
+        Changing the snapshot raises TypeError.
+        """
+        if self._owned is _FROZEN:
+            return self
+
+        self._finish_rehash()
+        snapshot = copy.copy(self)
+        snapshot._owned = _FROZEN
+        self._owned = _SHARED
+        return snapshot
+
+    def _check_writable(self) -> None:
+        """
+        Raises TypeError if the map is a snapshot.
+        """
+        if self._owned is _FROZEN:
+            raise TypeError("a HashMap snapshot is read-only")
+
+    def _own(self, index: int) -> None:
+        """
+        Makes the bucket at index the map's own before it's written,
+        copying what a snapshot still shares with the map.
+        """
+        self._check_writable()
+        if self._owned is _SHARED:
+            self._copy_buckets()
+            self._owned = bytearray(self._capacity)
+
+        if not self._owned[index]:
+            self._copy_bucket(index)
+            self._owned[index] = 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a dynamic array where each index contains a tuple of a key/value pair
         stored in the hash map. The order of the keys in the dynamic array does not matter.
-
+        items() streams the same pairs without building the array.
         """
         tuple_arr = DynamicArray()
 
-        # iterate through array
-        for index in range(self._buckets.length()):
-            if self._buckets[index] is not None:  # if the bucket isn't empty
-                pair = self._buckets.get_at_index(index)
-                if pair.is_tombstone is False:
-                    tuple_arr.append((pair.key, pair.value))
+        for pair in self._iter_entries():
+            tuple_arr.append(pair)
 
         return tuple_arr
 
+    def keys(self) -> KeysView:
+        """
+        Returns a live view of the keys in the hash map.
+        """
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a live view of the values in the hash map.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a live view of the (key, value) pairs in the hash map.
+        """
+        return ItemsView(self)
+
+    def _iter_full(self):
+        """
+        Yields the index of every full bucket, skipping empty ones and tombstones.
+        Raises RuntimeError if keys come or go while it runs.
+        """
+        self._finish_rehash()
+        version = self._version
+
+        for index in range(self._capacity):
+            if self._version != version:
+                raise RuntimeError("HashMap changed size during iteration")
+            if self._control[index] < EMPTY:
+                yield index
+
+        if self._version != version:
+            raise RuntimeError("HashMap changed size during iteration")
+
+    def _iter_entries(self):
+        """
+        Yields the (key, value) pair of every full bucket, see _iter_full().
+        """
+        for index in self._iter_full():
+            yield self._key_at(index), self._value_at(index)
+
     def __iter__(self):
         """
-        Enables the hash map to iterate across itself.
-        Implement this method in a similar way to the example in the Exploration: Encapsulation and Iterators.
+        Enables the hash map to iterate across itself, yielding the entry of every full bucket.
+        Every loop gets its own generator, so loops over the same map don't interfere.
+        Raises RuntimeError if keys come or go while it runs.
+        """
+        for index in self._iter_full():
+            yield self._entry_at(index)
+
+
+class CompactHashMap(HashMap):
+    """
+    HashMap that keeps its buckets in parallel flat arrays instead of one HashEntry
+    object per key: a list of keys, a list of values, an array('Q') of cached hashes
+    and the control bytes. HashEntry objects are only built when iteration asks for them.
+
+    That is 8 + 8 + 8 + 1 = 25 bytes per bucket. The entry layout pays 8 + 1 bytes per
+    bucket plus a HashEntry (about 64 bytes with its __slots__ on 64-bit CPython 3.11)
+    per key. Measured with tracemalloc over 20,000 keys at load 0.49, the map itself
+    takes 115 bytes per key with entries and 52 bytes per key compact (the key and
+    value objects are not counted). Hashes are truncated to 64 bits to fit the array.
+    """
+
+    def _reset_buckets(self, capacity: int) -> None:
+        """
+        Replaces the table with capacity empty buckets.
+        """
+        self._capacity = capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._control = bytearray([EMPTY]) * capacity
+
+        self._size = 0
+        self._tombstones = 0
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the hash the table uses for key, truncated to 64 bits.
+        """
+        return super()._hash(key) & 0xFFFFFFFFFFFFFFFF
+
+    def _hash_many(self, keys: list) -> list:
+        """
+        Returns the hashes the table uses for a batch of keys, truncated to 64 bits.
+        """
+        return [hash & 0xFFFFFFFFFFFFFFFF for hash in super()._hash_many(keys)]
+
+    def _entry_at(self, index: int) -> HashEntry:
         """
-        self._index = 0
+        Builds an entry for the bucket at index, or returns None for an empty bucket.
+        """
+        if self._control[index] == EMPTY:
+            return None
 
-        return self
+        entry = HashEntry(self._keys[index], self._values[index], self._hashes[index])
+        entry.is_tombstone = self._control[index] == DELETED
+        return entry
 
-    def __next__(self):
+    def _key_at(self, index: int) -> str:
         """
-        Returns the next item in the hash map, based on the current location of the iterator.
-        Implement this method in a similar way to the example in the Exploration: Encapsulation and Iterators.
-        It will need to only iterate over active items.
+        Returns the key in the full bucket at index.
         """
-        try:
-            while self._buckets[self._index] is None:
-                self._index += 1
-            value = self._buckets.get_at_index(self._index)
-        except DynamicArrayException:
-            raise StopIteration
+        return self._keys[index]
 
-        self._index = self._index + 1
-        return value
+    def _value_at(self, index: int) -> object:
+        """
+        Returns the value in the full bucket at index.
+        """
+        return self._values[index]
+
+    def _hash_at(self, index: int) -> int:
+        """
+        Returns the cached hash of the key in the full bucket at index.
+        """
+        return self._hashes[index]
+
+    def _matches(self, index: int, key: str, hash: int) -> bool:
+        """
+        Returns True if the full bucket at index holds key, comparing cached hashes first.
+        """
+        return self._hashes[index] == hash and self._keys[index] == key
+
+    def _set_value_at(self, index: int, value: object) -> None:
+        """
+        Replaces the value in the full bucket at index.
+        """
+        self._values[index] = value
+
+    def _store_at(self, index: int, key: str, value: object, hash: int) -> None:
+        """
+        Puts a new key/value pair in the bucket at index.
+        """
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = hash
+
+    def _delete_at(self, index: int) -> None:
+        """
+        Drops the value in the bucket at index, the control byte marks it as a tombstone.
+        """
+        self._values[index] = None
+
+    def _discard_at(self, index: int) -> None:
+        """
+        Lets go of the key and value in the bucket at index. The caller marks the bucket
+        DELETED in the control bytes, so probing treats it as a tombstone.
+        """
+        self._keys[index] = None
+        self._values[index] = None
+
+    def _copy_buckets(self) -> None:
+        """
+        Replaces the bucket arrays with copies.
+        """
+        self._keys = self._keys[:]
+        self._values = self._values[:]
+        self._hashes = self._hashes[:]
+        self._control = bytearray(self._control)
+
+    def _copy_bucket(self, index: int) -> None:
+        """
+        Nothing to copy, the arrays hold no entry objects.
+        """
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -507,3 +1224,76 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nput_many / from_items example 1")
+    print("-------------------------------")
+    m = HashMap.from_items(((str(i), i * 10) for i in range(100)), hash_function_2)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    m.put_many([('5', 'five'), ('500', 5000)])
+    print(m.get_size(), m.get_capacity(), m.get('5'), m.get('500'))
+
+    print("\nresize policy example 1")
+    print("-----------------------")
+    m = HashMap(11, hash_function_2, policy=ResizePolicy(0.5, growth_factor=1.5, min_load=0.1))
+    for i in range(1000):
+        m.put(str(i), i)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    for i in range(990):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nincremental resize example 1")
+    print("----------------------------")
+    # stop in the middle of a resize: most entries are still in the old table
+    m = HashMap(11, hash_function_2, incremental=True, rehash_step=1)
+    for i in range(200):
+        m.put(str(i), i)
+    print(m._old is not None, m.get_size(), m.get_capacity(), round(m.table_load(), 2),
+          m.empty_buckets(), m.get_tombstones())
+    print(m.get_size() + m.empty_buckets() + m.get_tombstones() == m.get_capacity())
+
+    print("\nkeys / values / items example 1")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), i * 10)
+    m.remove('3')
+    print(sorted(m.keys()), sorted(m.values()), len(m.items()), ('2', 20) in m.items())
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print('RuntimeError:', error)
+
+    print("\nsave / load example 1")
+    print("---------------------")
+    import os
+    import tempfile
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 31):
+        m.put('key' + str(i), i * 10)
+    m.remove('key7')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.snapshot')
+        m.save(path)
+        loaded = HashMap.load(path)
+    print(loaded.get_size(), loaded.get_capacity(), loaded.get('key30'), loaded.contains_key('key7'))
+    print(list(loaded.items()) == list(m.items()))
+
+    print("\nsnapshot example 1")
+    print("------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), i * 10)
+    snapshot = m.snapshot()
+    m.put('1', 'changed')
+    m.remove('2')
+    m.put('6', 60)
+    print(sorted(snapshot.items()), snapshot.get_size())
+    print(sorted(m.items()), m.get_size())
+    try:
+        snapshot.put('7', 70)
+    except TypeError as error:
+        print('TypeError:', error)
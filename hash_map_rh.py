@@ -0,0 +1,292 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Implementation of a HashMap using Open Addressing with Robin Hood
+#              linear probing and backward-shift deletion.
+
+from a6_include import DynamicArray, HashEntry, hash_function_1, hash_function_2, is_prime, next_prime
+
+
+class HashMap:
+    def __init__(self, capacity: int, function, max_load: float = 0.9) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood linear probing
+        for collision resolution. The table grows once more than max_load
+        of its buckets would be in use.
+        """
+        # a full table leaves _insert() nowhere to go
+        if not 0 < max_load < 1:
+            raise ValueError(f"max_load must be between 0 and 1, not {max_load}")
+
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._reset_buckets()
+
+        self._hash_function = function
+        self._max_load = max_load
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _reset_buckets(self) -> None:
+        """
+        Replaces the table with capacity empty buckets.
+        """
+        self._buckets = DynamicArray([None] * self._capacity, copy=False)
+
+        # how far each entry sits from its home bucket, as unboxed 64-bit integers
+        self._distances = DynamicArray(bytearray(8 * self._capacity), typecode='q', copy=False)
+        self._size = 0
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Returns the index of the bucket holding key, whose hash is given,
+        or None if the key is not in the map.
+        """
+        index = hash % self._capacity
+        distance = 0
+
+        while True:
+            pair = self._buckets.get_at_index(index)
+
+            # an empty bucket, or an entry closer to home than we are, means the key
+            # would have displaced it on insert: it can't be further along
+            if pair is None or self._distances.get_at_index(index) < distance:
+                return None
+
+            if pair.hash == hash and pair.key == key:
+                return index
+
+            index = (index + 1) % self._capacity
+            distance += 1
+
+    def _insert(self, entry: HashEntry) -> None:
+        """
+        Places an entry whose key is not in the map yet, taking buckets
+        from entries that are closer to their home bucket along the way.
+        The entry's cached hash picks its home bucket.
+        """
+        index = entry.hash % self._capacity
+        distance = 0
+
+        while True:
+            pair = self._buckets.get_at_index(index)
+
+            if pair is None:
+                self._buckets.set_at_index(index, entry)
+                self._distances.set_at_index(index, distance)
+                self._size += 1
+                return
+
+            # rob the richer entry: it moves on and keeps probing in our place
+            if self._distances.get_at_index(index) < distance:
+                self._buckets.set_at_index(index, entry)
+                entry = pair
+                distance, previous = self._distances.get_at_index(index), distance
+                self._distances.set_at_index(index, previous)
+
+            index = (index + 1) % self._capacity
+            distance += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map.
+        If the given key already exists in the hash map,
+        its associated value must be replaced with the new value.
+        If the given key is not in the hash map, a new key/value pair must be added.
+        """
+        hash = self._hash_function(key)
+        index = self._find(key, hash)
+        if index is not None:
+            self._buckets.get_at_index(index).value = value
+            return
+
+        # resize to double its current capacity when the new entry
+        # would push the load factor past max_load
+        if (self._size + 1) / self._capacity > self._max_load:
+            self.resize_table(self._capacity * 2)
+
+        self._insert(HashEntry(key, value, hash))
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor.
+        """
+        return float(self._size / self._capacity)
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        """
+        return self._capacity - self._size
+
+    def probe_stats(self) -> (float, int):
+        """
+        Returns the average and maximum probe length of the entries in the map,
+        counted as the number of buckets a successful get() inspects.
+        """
+        total, longest = 0, 0
+
+        for index in range(self._buckets.length()):
+            if self._buckets.get_at_index(index) is not None:
+                length = self._distances.get_at_index(index) + 1
+                total += length
+                longest = max(longest, length)
+
+        if self._size == 0:
+            return 0.0, 0
+        return total / self._size, longest
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash table.
+        All existing key/value pairs must remain in the new hash map,
+        and all hash table links must be rehashed.
+        """
+        if new_capacity < self._size:
+            return
+
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        # hold the old values
+        holder = self._buckets
+
+        # reset the arrays
+        self._capacity = new_capacity
+        self._reset_buckets()
+
+        # keys are known to be distinct, so skip the lookup put() would do
+        for index in range(holder.length()):
+            if holder[index] is not None:
+                self._insert(holder[index])
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+        If the key is not in the hash map, the method returns None.
+        """
+        index = self._find(key, self._hash_function(key))
+        if index is None:
+            return None
+
+        return self._buckets.get_at_index(index).value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map.
+        Otherwise it returns False.
+        """
+        if self._size == 0:
+            return False
+
+        return self._find(key, self._hash_function(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing (no exception needs to be raised).
+        """
+        index = self._find(key, self._hash_function(key))
+        if index is None:
+            return
+
+        # backward shift: pull each following displaced entry one bucket closer to home
+        # until an empty bucket or an entry already at home, so no tombstone is needed
+        following = (index + 1) % self._capacity
+        while (self._buckets.get_at_index(following) is not None
+               and self._distances.get_at_index(following) > 0):
+            self._buckets.set_at_index(index, self._buckets.get_at_index(following))
+            self._distances.set_at_index(index, self._distances.get_at_index(following) - 1)
+            index, following = following, (following + 1) % self._capacity
+
+        self._buckets.set_at_index(index, None)
+        self._distances.set_at_index(index, 0)
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+        It does not change the underlying hash table capacity.
+        """
+        self._reset_buckets()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map. The order of the keys in the dynamic array does not matter.
+        """
+        tuple_arr = DynamicArray()
+
+        for pair in self:
+            tuple_arr.append((pair.key, pair.value))
+
+        return tuple_arr
+
+    def __iter__(self):
+        """
+        Yields the entries of the hash map in bucket order.
+        """
+        for index in range(self._buckets.length()):
+            pair = self._buckets.get_at_index(index)
+            if pair is not None:
+                yield pair
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nRH - put example 1")
+    print("------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nRH - put example 2")
+    print("------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nRH - remove example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(9):
+        m.put('key' + str(i), i)
+    m.remove('key3')
+    m.remove('key8')
+    print(m)
+    result = not m.contains_key('key3') and not m.contains_key('key8')
+    for i in (0, 1, 2, 4, 5, 6, 7):
+        result &= m.get('key' + str(i)) == i
+    print(result, m.get_size(), m.get_capacity())
+
+    print("\nRH - probe_stats example 1")
+    print("--------------------------")
+    m = HashMap(101, hash_function_2)
+    for i in range(90):
+        m.put('key' + str(i), i)
+    print(round(m.table_load(), 2), m.probe_stats())
@@ -0,0 +1,545 @@
+# Name: Leela Townsley
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing HashMap in shared memory, written by one process
+#              and read in place by any number of others.
+
+import contextlib
+import io
+import os
+import pickle
+import platform
+import tempfile
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import fcntl
+except ImportError:     # Windows, only needed on machines that reorder stores
+    fcntl = None
+
+from a6_include import DynamicArray
+from hash_map_disk import DiskHashMap, _SlotFile
+from hash_map_oa import HashMap
+
+# the directory block: a sequence word, a generation word,
+# then the length and name of the block holding the current table
+_DIRECTORY_SIZE = 256
+_NAME_OFFSET = 16
+
+# the seqlock alone needs stores to become visible to other processes in the order
+# they were made, which x86 guarantees; Python has no barriers to enforce it elsewhere
+_ORDERED_MACHINES = ('x86_64', 'amd64', 'x86', 'i386', 'i486', 'i586', 'i686')
+
+# seconds a reader waits for the writer to finish a write before giving up
+DEFAULT_TIMEOUT = 5.0
+
+# longest sleep between two tries of a read
+_MAX_BACKOFF = 0.001
+
+
+def _open_lock(name: str) -> int:
+    """
+    Returns a descriptor of the lock file of the map called name, or None on machines
+    that keep stores in order and need no lock (see SharedHashMap).
+    """
+    machine = platform.machine().lower()
+    if machine in _ORDERED_MACHINES:
+        return None
+    if fcntl is None:
+        raise RuntimeError(f"SharedHashMap needs file locks on {machine or 'this machine'}, "
+                           f"which may reorder stores, and this platform has no fcntl")
+
+    return os.open(_lock_path(name), os.O_RDWR | os.O_CREAT, 0o600)
+
+
+def _lock_path(name: str) -> str:
+    """
+    Returns the path of the lock file of the map called name.
+    """
+    return os.path.join(tempfile.gettempdir(), 'SharedHashMap-' + name.lstrip('/') + '.lock')
+
+
+def _backoff(timeout: float):
+    """
+    Yields once per try of a read: the first try right away, each following one
+    after a sleep that doubles from nothing up to _MAX_BACKOFF, so a waiting reader
+    doesn't spin a core. Raises TimeoutError once timeout seconds have gone by,
+    as when the writer died in the middle of a write and left the sequence number odd.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.0
+    while True:
+        yield
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"the SharedHashMap writer didn't finish a write within {timeout} s")
+        time.sleep(delay)
+        delay = min(max(2 * delay, 1e-6), _MAX_BACKOFF)
+
+
+def _create(size: int, name: str = None) -> shared_memory.SharedMemory:
+    """
+    Creates a shared memory block of size bytes.
+    """
+    return shared_memory.SharedMemory(name, create=True, size=size)
+
+
+def _tracker_name(block: shared_memory.SharedMemory) -> str:
+    """
+    Returns the name the resource tracker knows block by.
+    """
+    # SharedMemory registers its private _name, which keeps the leading '/' that
+    # name drops on POSIX; no public attribute has it (Python 3.8 to 3.13)
+    return block._name
+
+
+def _remove(block: shared_memory.SharedMemory) -> None:
+    """
+    Closes and removes a block this process created.
+    """
+    block.close()
+
+    # a reader sharing this process's resource tracker (one started by multiprocessing)
+    # may have unregistered the block, and unlink() expects it to be registered
+    resource_tracker.register(_tracker_name(block), 'shared_memory')
+    block.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to an existing shared memory block without letting this process's
+    resource tracker remove it at exit: it belongs to the process that created it.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # before Python 3.13 every attached block was tracked; a reader sharing the writer's
+        # resource tracker may unregister a block the writer just removed, which the
+        # tracker reports (a KeyError) and otherwise ignores
+        block = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(_tracker_name(block), 'shared_memory')
+        return block
+
+
+class SharedHashMap(DiskHashMap):
+    """
+    Open addressing HashMap with the record layout of DiskHashMap (the probing and
+    capacities of hash_map_oa.HashMap, 32-byte bucket records, an append-only heap of
+    UTF-8 keys and pickled values) in a multiprocessing.shared_memory block instead of files.
+    One process creates and writes the map, others attach() to it by name and read
+    the same memory: a worker pool holds one copy of the table, not one per worker.
+
+    The block named name is a small directory pointing at the block that holds the table.
+    Growing the table or its heap builds a new block and points the directory at it,
+    readers switch over on their next lookup and the old block is removed.
+
+    Updates follow a seqlock: the writer makes the directory's sequence number odd
+    before it changes anything and even again once it is done, and a reader repeats
+    any read that overlapped a change (the sequence number was odd, or differs after
+    the read), so it never returns a half-written entry. Readers take no lock and
+    never block the writer. Python has no memory barriers, so this relies on stores
+    becoming visible in the order they were made, as they do on x86. Elsewhere (arm64...)
+    the writer also holds an exclusive flock() on a lock file for each change and
+    a reader a shared one for each try, and the system calls order the stores.
+    A reader waiting on a write backs off and gives up with a TimeoutError after
+    timeout seconds.
+    """
+
+    def __init__(self, name: str, capacity: int, function, heap_size: int = 1 << 20, **options) -> None:
+        """
+        Creates a new, empty SharedHashMap in shared memory, with a generated name if name is None.
+        heap_size is the number of bytes first set aside for keys and values, it doubles
+        whenever it fills up. Takes the options of hash_map_oa.HashMap, except incremental.
+        """
+        if options.get('incremental'):
+            raise ValueError("a SharedHashMap resizes all at once, it can't be incremental")
+
+        self._directory = _create(_DIRECTORY_SIZE, name)
+        try:
+            self._lock = _open_lock(self._directory.name)
+        except BaseException:
+            _remove(self._directory)
+            raise
+        self._words = self._directory.buf[:_NAME_OFFSET].cast('Q')
+        self._readonly = False
+        self._writes = 0        # nesting of write sections, see _writing()
+
+        self._slots = None
+        self._opened = None
+        self._settings = b''
+        self._heap_size = heap_size
+        self._heap_end = 0
+
+        HashMap.__init__(self, capacity, function, **options)
+
+        self._settings = self._pack_settings()
+        self._slots.write_settings(self._settings)
+
+    @classmethod
+    def attach(cls, name: str, function=None, step_function=None,
+               timeout: float = DEFAULT_TIMEOUT) -> "SharedHashMap":
+        """
+        Attaches read-only to the SharedHashMap called name, created by another process
+        (or this one). The hash functions are imported by name unless given, and have to
+        hash the way the writer's do, or a ValueError is raised. A read raises TimeoutError
+        if the writer is in the middle of a write for longer than timeout seconds.
+        """
+        map = cls.__new__(cls)
+        map._timeout = timeout
+        map._directory = _attach(name)
+        try:
+            map._lock = _open_lock(name)
+        except BaseException:
+            map._directory.close()
+            raise
+        map._words = map._directory.buf[:_NAME_OFFSET].cast('Q')
+        map._readonly = True
+        map._writes = 0
+
+        map._slots = None
+        map._generation, map._opened = map._attach_table()
+        map._settings = map._opened.settings()
+        map._heap_end = 0
+
+        map._adopt_settings(pickle.loads(map._settings), function, step_function)
+        return map
+
+    @property
+    def name(self) -> str:
+        """
+        The name other processes attach() to.
+        """
+        return self._directory.name
+
+    def close(self) -> None:
+        """
+        Detaches from the map. The writer also removes it, so close it last.
+        """
+        if self._slots is None:
+            return
+        self._slots.close()
+        self._slots = None
+        self._control = None
+
+        self._words.release()
+        if self._readonly:
+            self._directory.close()
+        else:
+            _remove(self._directory)
+
+        if self._lock is not None:
+            os.close(self._lock)
+            if not self._readonly:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(_lock_path(self.name))
+
+    def flush(self) -> None:
+        """
+        Nothing to do: every process sees a write to shared memory as soon as it's made.
+        """
+
+    def save(self, path: str) -> None:
+        """
+        Not supported, put the items in a HashMap to save them.
+        """
+        raise io.UnsupportedOperation("a SharedHashMap can't be saved, copy its items into a HashMap")
+
+    @classmethod
+    def load(cls, path: str, function=None, step_function=None) -> "HashMap":
+        """
+        Not supported: a SharedHashMap is never saved, see attach().
+        """
+        raise io.UnsupportedOperation("a SharedHashMap isn't loaded from a snapshot, attach() to it")
+
+    # ------------- blocks and the seqlock ------------- #
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """
+        Brackets a change to the map: the sequence number is odd while any is under way,
+        and the lock file, if any, is locked.
+        """
+        self._check_writable()
+        if self._writes == 0:
+            if self._lock is not None:
+                fcntl.flock(self._lock, fcntl.LOCK_EX)
+            self._words[0] += 1
+        self._writes += 1
+        try:
+            yield
+        finally:
+            self._writes -= 1
+            if self._writes == 0:
+                self._words[0] += 1
+                if self._lock is not None:
+                    fcntl.flock(self._lock, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def _reading(self):
+        """
+        Brackets one try of a read. Yields False, so the try is skipped,
+        if the writer holds the lock file; without one it always yields True.
+        """
+        if self._lock is None:
+            yield True
+            return
+
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(self._lock, fcntl.LOCK_UN)
+
+    def _attach_table(self) -> (int, _SlotFile):
+        """
+        Attaches to the block the directory points at and returns its generation and slots.
+        """
+        buffer = self._directory.buf
+        for _ in _backoff(self._timeout):
+            with self._reading() as clean:
+                if not clean:
+                    continue
+
+                start = self._words[0]
+                if start & 1:
+                    continue
+
+                generation = self._words[1]
+                length = buffer[_NAME_OFFSET]
+                name = bytes(buffer[_NAME_OFFSET + 1:_NAME_OFFSET + 1 + length]).decode()
+                if self._words[0] != start:
+                    continue
+
+                # the writer may have moved on and removed the block in the meantime
+                try:
+                    block = _attach(name)
+                except FileNotFoundError:
+                    continue
+                return generation, _SlotFile(block.buf, block.close, name)
+
+    def _new_block(self, capacity: int) -> _SlotFile:
+        """
+        Creates a shared memory block for a table of capacity empty buckets and the heap.
+        """
+        block = _create(_SlotFile.size(capacity) + self._heap_size)
+        _SlotFile.format(block.buf, capacity, self._settings)
+        return _SlotFile(block.buf, lambda: _remove(block), block.name)
+
+    def _publish(self, slots: _SlotFile) -> None:
+        """
+        Makes slots the table and points the directory at its block.
+        The caller closes the old table once it is done with it.
+        """
+        self._slots = slots
+        self._capacity = slots.capacity
+        self._control = slots.control
+
+        name = slots.name.encode()
+        self._directory.buf[_NAME_OFFSET] = len(name)
+        self._directory.buf[_NAME_OFFSET + 1:_NAME_OFFSET + 1 + len(name)] = name
+        self._words[1] += 1
+
+    def _new_slots(self, capacity: int) -> _SlotFile:
+        """
+        Returns a new block of capacity empty buckets, which takes along the heap,
+        so stored offsets stay valid. Readers don't see it until it is installed.
+        """
+        slots = self._new_block(capacity)
+        if self._slots is not None:
+            slots.heap[:self._heap_end] = self._slots.heap[:self._heap_end]
+        return slots
+
+    def _install_slots(self, slots: _SlotFile) -> None:
+        """
+        Points the directory at a new block.
+        """
+        with self._writing():
+            self._publish(slots)
+
+    def _discard_slots(self, slots: _SlotFile) -> None:
+        """
+        Removes a new block that was never installed.
+        """
+        slots.close()
+
+    def _append(self, data: bytes) -> int:
+        """
+        Appends data to the heap and returns its offset, moving the table
+        to a block with twice the heap space when it doesn't fit.
+        """
+        self._check_writable()
+        offset = self._heap_end
+        end = offset + 8 + len(data)
+
+        if end > len(self._slots.heap):
+            while self._heap_size < end:
+                self._heap_size *= 2
+
+            with self._writing():
+                old = self._slots
+                slots = self._new_block(old.capacity)
+
+                # the header, records and heap carry over byte for byte
+                slots.view[:len(old.view)] = old.view
+                self._publish(slots)
+                old.close()
+
+        heap = self._slots.heap
+        heap[offset:offset + 8] = len(data).to_bytes(8, 'little')
+        heap[offset + 8:end] = data
+        self._heap_end = end
+        return offset
+
+    def _read(self, offset: int) -> memoryview:
+        """
+        Returns a view of the data appended to the heap at offset, nothing is copied.
+        """
+        heap = self._slots.heap
+        length = int.from_bytes(heap[offset:offset + 8], 'little')
+        return heap[offset + 8:offset + 8 + length]
+
+    def _consistent(self, read, *args):
+        """
+        Returns read(*args), repeated until no write overlapped it.
+        A reader that finds the directory pointing at a new block switches to it first.
+        """
+        if not self._readonly:
+            return read(*args)
+
+        words = self._words
+        for _ in _backoff(self._timeout):
+            with self._reading() as clean:
+                if not clean:
+                    continue
+
+                start = words[0]
+                if start & 1:
+                    continue
+
+                if words[1] != self._generation:
+                    old = self._slots
+                    self._generation, slots = self._attach_table()
+                    self._slots, self._capacity, self._control = slots, slots.capacity, slots.control
+                    old.close()
+                    continue
+
+                # a torn read can fail in any number of ways, only a clean one counts
+                try:
+                    result = read(*args)
+                except Exception:
+                    if words[0] == start:
+                        raise
+                    continue
+
+                if words[0] == start:
+                    return result
+
+    # ------------- writes go through the seqlock, reads are repeated as needed ------------- #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map, see HashMap.put().
+        """
+        with self._writing():
+            super().put(key, value)
+
+    def put_many(self, items) -> None:
+        """
+        Puts every (key, value) pair of an iterable in the hash map, see HashMap.put_many().
+        """
+        with self._writing():
+            super().put_many(items)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its value from the hash map, if it is there.
+        """
+        with self._writing():
+            super().remove(key)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Moves the table to a new block of new_capacity buckets, see DiskHashMap.resize_table().
+        """
+        with self._writing():
+            super().resize_table(new_capacity)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map and empties its heap.
+        """
+        with self._writing():
+            old = self._slots
+            self._heap_end = 0
+            HashMap.clear(self)
+            old.close()
+
+    def get_size(self) -> int:
+        """
+        Returns the number of key/value pairs in the hash map.
+        """
+        return self._consistent(super().get_size)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not in the hash map.
+        """
+        return self._consistent(super().get, key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map.
+        """
+        return self._consistent(super().contains_key, key)
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of each of the given keys, see HashMap.get_many().
+        """
+        return self._consistent(super().get_many, keys)
+
+    def contains_many(self, keys) -> list:
+        """
+        Returns a list telling, for each of the given keys, whether it is in the hash map.
+        """
+        return self._consistent(super().contains_many, keys)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of the key/value pairs in the hash map, all read in one consistent pass.
+        """
+        return self._consistent(super().get_keys_and_values)
+
+    def _iter_entries(self):
+        """
+        Yields the (key, value) pair of every entry, all read in one consistent pass.
+        """
+        yield from self._consistent(lambda: list(super(SharedHashMap, self)._iter_entries()))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    from a6_include import hash_function_2
+
+    print("\nSharedHashMap example 1")
+    print("-----------------------")
+    writer = SharedHashMap(None, 11, hash_function_2, heap_size=256)
+    for i in range(1, 101):
+        writer.put('key' + str(i), [i, i * i])
+    reader = SharedHashMap.attach(writer.name)
+    print(reader.get_size(), reader.get_capacity(), reader.get('key10'), reader.contains_key('key101'))
+
+    # the writer outgrows the table and the heap, the reader follows it
+    for i in range(101, 1001):
+        writer.put('key' + str(i), i)
+    writer.remove('key1')
+    print(reader.get_size(), reader.get_capacity(), reader.get('key1000'), reader.contains_key('key1'))
+
+    reader.close()
+    writer.close()